@@ -0,0 +1,336 @@
+"""
+Compiles the `CompositeCondition` trees of every course into small programs
+over integer course ids, so that checking which courses a user has unlocked
+does not need to walk the original condition objects.
+
+Each course the conditions know about is given an id, and the courses a user
+has taken are turned into bitsets over those ids. Course requirements then
+become bitmask tests, with equivalent courses folded into the masks, and
+runs of course requirements under the same AND/OR are merged into a single
+test. UOC/core aggregates are computed at most once per category per user.
+
+A reverse dependency index (`affected_by`) records which courses' conditions
+can change when a given course is added to or removed from a plan, so callers
+comparing two states only need to re-evaluate those.
+
+Results are exactly those of `Condition.validate`. Warnings are only ever
+generated (by `validate` itself) for unlocked courses whose conditions can
+produce a warning when satisfied - i.e. those with WAM or grade requirements.
+"""
+
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+from algorithms.objects.categories import Category
+from algorithms.objects.conditions import (CACHED_PROGRAM_MAPPINGS, CompositeCondition,
+                                           Condition, CoreqCourseCondition,
+                                           CourseCondition, CourseExclusionCondition,
+                                           CoresCondition, GradeCondition,
+                                           ProgramCondition, ProgramExclusionCondition,
+                                           ProgramTypeCondition, SpecialisationCondition,
+                                           UOCCondition, WAMCondition)
+from algorithms.objects.helper import Logic
+from algorithms.objects.user import CACHED_EQUIVALENTS, User
+
+# Opcodes of the compiled programs. Every instruction is a tuple starting with its opcode.
+TRUE = 0            # (TRUE,)
+AND = 1             # (AND, (instruction, ...))
+OR = 2              # (OR, (instruction, ...))
+ANY_TAKEN = 3       # (ANY_TAKEN, mask) - has passed any course in the mask
+ALL_TAKEN = 4       # (ALL_TAKEN, mask) - has passed every course in the mask
+ANY_TAKING = 5      # (ANY_TAKING, mask) - has passed or, is currently taking any course in the mask
+NONE_ENROLLED = 6   # (NONE_ENROLLED, mask) - has no course in the mask on their plan
+UOC = 7             # (UOC, category id, uoc)
+CORES = 8           # (CORES, category id)
+GRADE = 9           # (GRADE, course, grade)
+IN_PROGRAM = 10     # (IN_PROGRAM, programs) - program is one of the given programs
+NOT_IN_PROGRAM = 11 # (NOT_IN_PROGRAM, program)
+IN_SPEC = 12        # (IN_SPEC, specialisation)
+FALLBACK = 13       # (FALLBACK, condition) - anything else is handed back to `validate`
+
+Instruction = tuple
+
+
+class CompiledConditions:
+    """ The compiled programs for every course's conditions """
+
+    def __init__(self, conditions: Mapping[str, Optional[CompositeCondition]]):
+        self.conditions = conditions
+        # course code -> bit in the user bitsets
+        self.course_ids: Dict[str, int] = {}
+        # category id -> category, ids are shared by categories with the same definition
+        self.categories: List[Category] = []
+        self._category_ids: Dict[str, int] = {}
+
+        # course -> compiled program (None for courses without conditions)
+        self.programs: Dict[str, Optional[Instruction]] = {
+            course: self._compile(condition) if condition is not None else None
+            for course, condition in conditions.items()
+        }
+        # courses whose conditions can give warnings even when they are satisfied
+        self.may_warn: set[str] = {
+            course for course, condition in conditions.items()
+            if condition is not None and _may_warn(condition)
+        }
+
+        # Reverse dependency index; which courses' conditions can change when
+        # a course is added to (or removed from) a user
+        # course id -> courses with a condition on that course (or an equivalent)
+        self.course_dependents: Dict[int, set[str]] = {}
+        # category id -> courses with a UOC condition in that category
+        self.category_dependents: Dict[int, set[str]] = {}
+        # courses which always need to be rechecked (core and uncompiled conditions)
+        self.always_dependent: set[str] = set()
+        for course, program in self.programs.items():
+            if program is not None:
+                self._index_dependents(course, program)
+
+    def evaluator(self, user: User) -> "ConditionsEvaluator":
+        """ Returns an evaluator for the given user's current state """
+        return ConditionsEvaluator(self, user)
+
+    def course_bit(self, course: str) -> int:
+        """ Returns the bit for a course, giving it a new id if needed """
+        course_id = self.course_ids.get(course)
+        if course_id is None:
+            course_id = self.course_ids[course] = len(self.course_ids)
+        return 1 << course_id
+
+    def category_id(self, category: Category) -> int:
+        """ Returns the id for a category, sharing ids between identical categories """
+        key = f"{type(category).__name__}:{category}"
+        category_id = self._category_ids.get(key)
+        if category_id is None:
+            category_id = self._category_ids[key] = len(self.categories)
+            self.categories.append(category)
+        return category_id
+
+    def equivalence_mask(self, course: str) -> int:
+        """ The mask of a course and all of its equivalents """
+        mask = self.course_bit(course)
+        for equivalent in CACHED_EQUIVALENTS.get(course) or []:
+            mask |= self.course_bit(equivalent)
+        return mask
+
+    def affected_by(self, course: str) -> set[str]:
+        """
+        Returns every course whose unlocked state may change when the given
+        course is added to, removed from or, given a new mark in a user's plan.
+        WAM conditions are never included as they are always met.
+        """
+        affected = set(self.always_dependent)
+        course_id = self.course_ids.get(course)
+        if course_id is not None:
+            affected |= self.course_dependents.get(course_id, set())
+        for category_id, dependents in self.category_dependents.items():
+            if self.categories[category_id].match_definition(course):
+                affected |= dependents
+        return affected
+
+    def _index_dependents(self, course: str, instruction: Instruction) -> None:
+        """ Adds the course to the reverse dependency index for everything in its program """
+        op = instruction[0]
+        if op in (AND, OR):
+            for child in instruction[1]:
+                self._index_dependents(course, child)
+        elif op in (ANY_TAKEN, ALL_TAKEN, ANY_TAKING, NONE_ENROLLED):
+            mask = instruction[1]
+            while mask:
+                lowest = mask & -mask
+                self.course_dependents.setdefault(lowest.bit_length() - 1, set()).add(course)
+                mask ^= lowest
+        elif op == GRADE:
+            self.course_dependents.setdefault(self.course_ids[instruction[1]], set()).add(course)
+        elif op == UOC:
+            self.category_dependents.setdefault(instruction[1], set()).add(course)
+        elif op in (CORES, FALLBACK):
+            self.always_dependent.add(course)
+
+    def _compile(self, condition: Condition) -> Instruction:
+        """ Compiles a condition (tree) into a program """
+        # NOTE: exact types are checked so that any subclasses go to the fallback
+        if type(condition) is CompositeCondition:
+            return self._compile_composite(condition)
+        if type(condition) is CourseCondition:
+            return (ANY_TAKEN, self.equivalence_mask(condition.course))
+        if type(condition) is CoreqCourseCondition:
+            return (ANY_TAKING, self.equivalence_mask(condition.course))
+        if type(condition) is CourseExclusionCondition:
+            return (NONE_ENROLLED, self.course_bit(condition.course))
+        if type(condition) is UOCCondition:
+            return (UOC, self.category_id(condition.category), condition.uoc)
+        if type(condition) is CoresCondition:
+            return (CORES, self.category_id(condition.category))
+        if type(condition) is WAMCondition:
+            # WAM conditions are always met; they only ever warn
+            return (TRUE,)
+        if type(condition) is GradeCondition:
+            self.course_bit(condition.course)
+            return (GRADE, condition.course, condition.grade)
+        if type(condition) is ProgramCondition:
+            return (IN_PROGRAM, frozenset([condition.program]))
+        if type(condition) is ProgramTypeCondition and condition.programType in CACHED_PROGRAM_MAPPINGS:
+            return (IN_PROGRAM, frozenset(CACHED_PROGRAM_MAPPINGS[condition.programType]))
+        if type(condition) is ProgramExclusionCondition:
+            return (NOT_IN_PROGRAM, condition.exclusion)
+        if type(condition) is SpecialisationCondition:
+            return (IN_SPEC, condition.specialisation)
+        return (FALLBACK, condition)
+
+    def _compile_composite(self, condition: CompositeCondition) -> Instruction:
+        """
+        Compiles an AND/OR, flattening nested AND/ORs of the same logic and
+        merging runs of course requirements into a single mask test
+        """
+        logic = AND if condition.logic == Logic.AND else OR
+        children: List[Instruction] = []
+        for child in map(self._compile, condition.conditions):
+            if child[0] == logic:
+                children.extend(child[1])
+            else:
+                children.append(child)
+
+        if logic == AND:
+            # everything in an AND of single courses must be taken
+            singles = [c for c in children if c[0] in (ANY_TAKEN, ALL_TAKEN) and c[1].bit_count() == 1]
+            all_taken = [c for c in children if c[0] == ALL_TAKEN]
+            exclusions = [c for c in children if c[0] == NONE_ENROLLED]
+            rest = [
+                c for c in children
+                if c[0] != TRUE and c not in singles and c not in all_taken and c not in exclusions
+            ]
+            merged: List[Instruction] = []
+            if singles or all_taken:
+                merged.append((ALL_TAKEN, _union(c[1] for c in singles + all_taken)))
+            if exclusions:
+                merged.append((NONE_ENROLLED, _union(c[1] for c in exclusions)))
+            children = merged + rest
+            if not children:
+                return (TRUE,)
+        else:
+            if not children or any(c[0] == TRUE for c in children):
+                return (TRUE,)
+            # an OR of courses is met by taking any one of them
+            any_taken = [c for c in children if c[0] == ANY_TAKEN or (c[0] == ALL_TAKEN and c[1].bit_count() == 1)]
+            rest = [c for c in children if c not in any_taken]
+            children = ([(ANY_TAKEN, _union(c[1] for c in any_taken))] if any_taken else []) + rest
+
+        return children[0] if len(children) == 1 else (logic, tuple(children))
+
+
+class ConditionsEvaluator:
+    """ Evaluates the compiled conditions against a single user """
+
+    def __init__(self, compiled: CompiledConditions, user: User):
+        self.compiled = compiled
+        self.user = user
+
+        # bitsets of the courses on the user's plan, the ones they have
+        # passed (or have no mark for) and, the ones they are currently taking
+        self.enrolled = 0
+        self.passed = 0
+        for course, (_, mark) in user.courses.items():
+            course_id = compiled.course_ids.get(course)
+            if course_id is not None:
+                self.enrolled |= 1 << course_id
+                if (mark or 50) >= 50:
+                    self.passed |= 1 << course_id
+        self.taking = self.passed
+        for course in user.cur_courses:
+            course_id = compiled.course_ids.get(course)
+            if course_id is not None:
+                self.taking |= 1 << course_id
+
+        # aggregates computed at most once per user
+        self._uoc: Dict[int, int] = {}
+        self._cores: Dict[int, bool] = {}
+        self._specs: Dict[str, bool] = {}
+
+    def is_unlocked(self, course: str) -> bool:
+        """ Equivalent to `CONDITIONS[course].validate(user)[0]` (True if no conditions) """
+        program = self.compiled.programs.get(course)
+        return program is None or self._holds(program)
+
+    def validate(self, course: str) -> Tuple[bool, List[str]]:
+        """ Equivalent to `CONDITIONS[course].validate(user)` ((True, []) if no conditions) """
+        condition = self.compiled.conditions.get(course)
+        if condition is None:
+            return True, []
+        if course in self.compiled.may_warn or not self.is_unlocked(course):
+            return condition.validate(self.user)
+        return True, []
+
+    def unlocked(self) -> Iterator[Tuple[str, List[str]]]:
+        """ Yields every unlocked course along with its warnings """
+        for course, program in self.compiled.programs.items():
+            if program is not None and not self._holds(program):
+                continue
+            if course in self.compiled.may_warn:
+                yield course, self.compiled.conditions[course].validate(self.user)[1]  # type: ignore
+            else:
+                yield course, []
+
+    def _holds(self, instruction: Instruction) -> bool:
+        """ Runs a compiled program """
+        op = instruction[0]
+        if op == ANY_TAKEN:
+            return bool(self.passed & instruction[1])
+        if op == NONE_ENROLLED:
+            return not self.enrolled & instruction[1]
+        if op == AND:
+            for child in instruction[1]:
+                if not self._holds(child):
+                    return False
+            return True
+        if op == OR:
+            for child in instruction[1]:
+                if self._holds(child):
+                    return True
+            return False
+        if op == ALL_TAKEN:
+            return self.passed & instruction[1] == instruction[1]
+        if op == TRUE:
+            return True
+        if op == IN_PROGRAM:
+            return self.user.program in instruction[1]
+        if op == NOT_IN_PROGRAM:
+            return not self.user.in_program(instruction[1])
+        if op == UOC:
+            category_id = instruction[1]
+            if category_id not in self._uoc:
+                self._uoc[category_id] = self.user.uoc(self.compiled.categories[category_id])
+            return self._uoc[category_id] >= instruction[2]
+        if op == ANY_TAKING:
+            return bool(self.taking & instruction[1])
+        if op == IN_SPEC:
+            if instruction[1] not in self._specs:
+                self._specs[instruction[1]] = self.user.in_specialisation(instruction[1])
+            return self._specs[instruction[1]]
+        if op == CORES:
+            category_id = instruction[1]
+            if category_id not in self._cores:
+                self._cores[category_id] = self.user.completed_core(self.compiled.categories[category_id])
+            return self._cores[category_id]
+        if op == GRADE:
+            if instruction[1] not in self.user.courses:
+                return False
+            mark = self.user.get_grade(instruction[1])
+            return mark is None or mark >= instruction[2]
+        return instruction[1].validate(self.user)[0]
+
+
+def _union(masks: Iterator[int]) -> int:
+    """ Bitwise OR of all the given masks """
+    result = 0
+    for mask in masks:
+        result |= mask
+    return result
+
+def _may_warn(condition: Condition) -> bool:
+    """ Can this condition (tree) give a warning while being satisfied? """
+    if type(condition) is CompositeCondition:
+        return any(_may_warn(child) for child in condition.conditions)
+    return type(condition) not in (
+        CourseCondition, CoreqCourseCondition, CourseExclusionCondition,
+        UOCCondition, CoresCondition, ProgramCondition, ProgramTypeCondition,
+        ProgramExclusionCondition, SpecialisationCondition,
+    )
@@ -0,0 +1,201 @@
+"""
+Transitive closures over the course graph, so that "what does this course
+eventually unlock" and "what is everything behind this course" can be
+answered without walking the graph.
+
+The courses are first condensed into their strongly connected components
+(courses which are each other's prerequisites, e.g. corequisites), then each
+component's closure is built as a bitset from those of its neighbours, in
+topological order.
+"""
+
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, TypedDict
+
+
+class ReachabilityData(TypedDict):
+    courses: List[str]
+    # outgoing edges, as indexes into `courses`
+    unlocks: List[List[int]]
+    # transitive closures, as indexes into `courses`
+    descendants: List[List[int]]
+    ancestors: List[List[int]]
+
+
+class ReachabilityIndex:
+    """ The transitive closures of the course graph, in both directions """
+
+    def __init__(self, courses: List[str], unlocks: List[List[int]], descendants: List[int], ancestors: List[int]):
+        self.courses = courses
+        self.ids: Dict[str, int] = {course: index for index, course in enumerate(courses)}
+        # course id -> the ids of the courses it directly unlocks
+        self.unlocks = unlocks
+        self.prerequisites: List[List[int]] = [[] for _ in courses]
+        for source, targets in enumerate(unlocks):
+            for target in targets:
+                self.prerequisites[target].append(source)
+        # course id -> bitset of the course ids reachable from it (or reaching it)
+        self.descendant_sets = descendants
+        self.ancestor_sets = ancestors
+
+    @classmethod
+    def build(cls, outgoing_adjacency: Mapping[str, Sequence[str]]) -> "ReachabilityIndex":
+        """ Builds the index from a course -> courses it unlocks adjacency list """
+        courses = sorted(
+            set(outgoing_adjacency) | {target for targets in outgoing_adjacency.values() for target in targets}
+        )
+        ids = {course: index for index, course in enumerate(courses)}
+        unlocks = [
+            sorted({ids[target] for target in outgoing_adjacency.get(course, [])})
+            for course in courses
+        ]
+        prerequisites: List[List[int]] = [[] for _ in courses]
+        for source, targets in enumerate(unlocks):
+            for target in targets:
+                prerequisites[target].append(source)
+        return cls(courses, unlocks, _closures(unlocks), _closures(prerequisites))
+
+    @classmethod
+    def from_json(cls, data: ReachabilityData) -> "ReachabilityIndex":
+        return cls(
+            data["courses"], data["unlocks"],
+            [_to_bitset(ids) for ids in data["descendants"]],
+            [_to_bitset(ids) for ids in data["ancestors"]],
+        )
+
+    def to_json(self) -> ReachabilityData:
+        return {
+            "courses": self.courses,
+            "unlocks": self.unlocks,
+            "descendants": [list(_bits(bitset)) for bitset in self.descendant_sets],
+            "ancestors": [list(_bits(bitset)) for bitset in self.ancestor_sets],
+        }
+
+    def descendants(self, course: str, depth: Optional[int] = None) -> List[str]:
+        """
+        The courses which the course is (transitively) a prerequisite of,
+        optionally only those at most `depth` steps away.
+        Does not include the course itself.
+        """
+        return self._closure(course, depth, self.descendant_sets, self.unlocks)
+
+    def ancestors(self, course: str, depth: Optional[int] = None) -> List[str]:
+        """
+        The courses which are (transitively) prerequisites of the course,
+        optionally only those at most `depth` steps away.
+        Does not include the course itself.
+        """
+        return self._closure(course, depth, self.ancestor_sets, self.prerequisites)
+
+    def _closure(self, course: str, depth: Optional[int], closures: List[int], adjacency: List[List[int]]) -> List[str]:
+        course_id = self.ids.get(course)
+        if course_id is None:
+            return []
+        if depth is None:
+            bitset = closures[course_id]
+        else:
+            bitset = _within(course_id, depth, adjacency)
+        return [self.courses[index] for index in _bits(bitset & ~(1 << course_id))]
+
+
+def _closures(adjacency: List[List[int]]) -> List[int]:
+    """ Every node's transitive closure over the adjacency list, as bitsets """
+    components = _strongly_connected_components(adjacency)
+    component_of = [0] * len(adjacency)
+    for component_id, members in enumerate(components):
+        for node in members:
+            component_of[node] = component_id
+
+    # Tarjan's algorithm finds the components in reverse topological order, so
+    # every component's successors have been closed before it is reached
+    component_closures: List[int] = []
+    for component_id, members in enumerate(components):
+        closure = 0
+        cyclic = len(members) > 1
+        for node in members:
+            for neighbour in adjacency[node]:
+                neighbour_component = component_of[neighbour]
+                if neighbour_component == component_id:
+                    cyclic = True
+                else:
+                    closure |= component_closures[neighbour_component] | (1 << neighbour)
+        if cyclic:
+            closure |= _to_bitset(members)
+        component_closures.append(closure)
+
+    return [component_closures[component_of[node]] for node in range(len(adjacency))]
+
+def _strongly_connected_components(adjacency: List[List[int]]) -> List[List[int]]:
+    """ Tarjan's algorithm, iteratively (the graph is too deep for recursion) """
+    index: List[Optional[int]] = [None] * len(adjacency)
+    lowlink = [0] * len(adjacency)
+    on_stack = [False] * len(adjacency)
+    stack: List[int] = []
+    components: List[List[int]] = []
+    counter = 0
+
+    for root in range(len(adjacency)):
+        if index[root] is not None:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, child = work.pop()
+            if child == 0:
+                index[node] = lowlink[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack[node] = True
+            recurse = False
+            for position in range(child, len(adjacency[node])):
+                neighbour = adjacency[node][position]
+                neighbour_index = index[neighbour]
+                if neighbour_index is None:
+                    work.append((node, position + 1))
+                    work.append((neighbour, 0))
+                    recurse = True
+                    break
+                if on_stack[neighbour]:
+                    lowlink[node] = min(lowlink[node], neighbour_index)
+            if recurse:
+                continue
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+    return components
+
+def _within(start: int, depth: int, adjacency: List[List[int]]) -> int:
+    """ The nodes at most `depth` steps from `start`, as a bitset """
+    seen = 1 << start
+    frontier = [start]
+    for _ in range(depth):
+        next_frontier = []
+        for node in frontier:
+            for neighbour in adjacency[node]:
+                if not seen >> neighbour & 1:
+                    seen |= 1 << neighbour
+                    next_frontier.append(neighbour)
+        if not next_frontier:
+            break
+        frontier = next_frontier
+    return seen
+
+def _to_bitset(ids: Sequence[int]) -> int:
+    bitset = 0
+    for node in ids:
+        bitset |= 1 << node
+    return bitset
+
+def _bits(bitset: int) -> Iterator[int]:
+    """ The indexes of the set bits, in increasing order """
+    while bitset:
+        lowest = bitset & -bitset
+        yield lowest.bit_length() - 1
+        bitset ^= lowest
@@ -0,0 +1,83 @@
+"""
+Tests that the compiled conditions give the exact same results as
+`Condition.validate` for every course.
+"""
+
+import copy
+import json
+
+import pytest
+
+from algorithms.compiled_conditions import CompiledConditions
+from algorithms.objects.user import User
+from server.routers.model import CONDITIONS
+
+PATH = "./algorithms/tests/exampleUsers.json"
+
+with open(PATH, encoding="utf8") as f:
+    USERS = json.load(f)
+
+COMPILED = CompiledConditions(CONDITIONS)
+
+
+def assert_matches_validate(user: User):
+    evaluator = COMPILED.evaluator(user)
+    for course, condition in CONDITIONS.items():
+        expected = condition.validate(user) if condition is not None else (True, [])
+        assert evaluator.is_unlocked(course) == expected[0], course
+        assert evaluator.validate(course) == expected, course
+
+    expected_unlocked = {
+        course: condition.validate(user)[1] if condition is not None else []
+        for course, condition in CONDITIONS.items()
+        if condition is None or condition.validate(user)[0]
+    }
+    assert dict(evaluator.unlocked()) == expected_unlocked
+
+
+@pytest.mark.parametrize("user_name", USERS.keys())
+def test_example_users_match_validate(user_name):
+    assert_matches_validate(User(copy.deepcopy(USERS[user_name])))
+
+
+def test_current_courses_match_validate():
+    user = User(copy.deepcopy(USERS["user1"]))
+    user.add_current_courses({"COMP2521": (6, None), "MATH1231": (6, None)})
+    assert_matches_validate(user)
+
+
+def test_programs_and_specialisations_match_validate():
+    user = User(copy.deepcopy(USERS["user2"]))
+    user.program = "3707"
+    user.specialisations = ["COMPA1", "MECHAH"]
+    user.core_courses = ["COMP1511", "COMP1521", "MATH1131", "ENGG1000"]
+    assert_matches_validate(user)
+
+
+def test_failed_and_unmarked_courses_match_validate():
+    user = User(copy.deepcopy(USERS["user6"]))
+    user.add_courses({
+        "COMP1511": (6, 45),
+        "MATH1131": (6, None),
+        "MATH1231": (6, 0),
+        "COMP3121": (6, 64),
+        "COMP6080": (6, 90),
+    })
+    assert_matches_validate(user)
+
+
+@pytest.mark.parametrize("user_name", ["user1", "user3", "user6"])
+@pytest.mark.parametrize("new_course", ["COMP1511", "COMP2521", "MATH1141", "DPST1091", "COMP3121", "ENGG1000"])
+def test_affected_by_covers_every_change(user_name, new_course):
+    """ Adding a course should only change the state of courses it affects """
+    user = User(copy.deepcopy(USERS[user_name]))
+    user.core_courses = ["COMP1511", "COMP2521", "MATH1131"]
+    before = COMPILED.evaluator(user)
+    before_unlocked = {course for course in CONDITIONS if before.is_unlocked(course)}
+
+    user.add_courses({new_course: (6, None)})
+    after = COMPILED.evaluator(user)
+    after_unlocked = {course for course in CONDITIONS if after.is_unlocked(course)}
+
+    changed = before_unlocked ^ after_unlocked
+    assert changed <= COMPILED.affected_by(new_course)
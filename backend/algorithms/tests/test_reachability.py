@@ -0,0 +1,62 @@
+import json
+from typing import Dict, List
+
+import pytest
+
+from algorithms.reachability import ReachabilityIndex
+from data.config import GRAPH_CACHE_FILE
+
+with open(GRAPH_CACHE_FILE, encoding="utf8") as f:
+    OUTGOING: Dict[str, List[str]] = json.load(f)["outgoing_adjacency_list"]
+
+INCOMING: Dict[str, List[str]] = {}
+for source, targets in OUTGOING.items():
+    for target in targets:
+        INCOMING.setdefault(target, []).append(source)
+
+INDEX = ReachabilityIndex.build(OUTGOING)
+
+
+def walk(adjacency: Dict[str, List[str]], course: str, depth: int | None = None) -> List[str]:
+    """ The naive, breadth first walk that the index replaces """
+    seen = {course}
+    frontier = [course]
+    steps = 0
+    while frontier and (depth is None or steps < depth):
+        next_frontier = []
+        for node in frontier:
+            for neighbour in adjacency.get(node, []):
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    next_frontier.append(neighbour)
+        frontier = next_frontier
+        steps += 1
+    return sorted(seen - {course})
+
+
+@pytest.mark.parametrize("course", ["COMP1511", "COMP2521", "COMP3900", "MATH1141", "ENGG1000", "COMP9999"])
+@pytest.mark.parametrize("depth", [None, 0, 1, 2, 5])
+def test_matches_walk(course, depth):
+    assert INDEX.descendants(course, depth) == walk(OUTGOING, course, depth)
+    assert INDEX.ancestors(course, depth) == walk(INCOMING, course, depth)
+
+
+def test_every_course():
+    for course in INDEX.courses:
+        assert INDEX.descendants(course) == walk(OUTGOING, course)
+        assert INDEX.ancestors(course) == walk(INCOMING, course)
+
+
+def test_cycles():
+    index = ReachabilityIndex.build({"A": ["B"], "B": ["C", "A"], "C": ["D"], "D": ["D"]})
+    assert index.descendants("A") == ["B", "C", "D"]
+    assert index.descendants("D") == []
+    assert index.ancestors("D") == ["A", "B", "C"]
+    assert index.ancestors("A") == ["B"]
+
+
+def test_json_round_trip():
+    loaded = ReachabilityIndex.from_json(json.loads(json.dumps(INDEX.to_json())))
+    assert loaded.descendant_sets == INDEX.descendant_sets
+    assert loaded.ancestor_sets == INDEX.ancestor_sets
+    assert loaded.descendants("COMP1511", 2) == INDEX.descendants("COMP1511", 2)
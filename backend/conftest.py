@@ -0,0 +1,10 @@
+"""
+Most of the server's tests run against a live server, but some call into the
+routers directly; those read the handbook data straight from the data
+pipeline's files rather than from a database. This is set here, before any
+test module imports `server.config`.
+"""
+
+import os
+
+os.environ.setdefault("STORAGE_BACKEND", "memory")
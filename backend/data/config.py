@@ -26,4 +26,11 @@ CONDITIONS_TOKEN_FILE: str = "./data/final_data/conditionsTokens.json"
 CONDITIONS_PICKLE_FILE: str = "./data/final_data/conditions.pkl"
 
 GRAPH_CACHE_FILE = "./data/final_data/graph.json"
+REACHABILITY_CACHE_FILE = "./data/final_data/reachability.json"
 
+
+ENROLMENT_DATA_FILE = "./data/final_data/enrolmentData.json"
+# The year which the latest enrolment scrape (ENROLMENT_DATA_FILE) is from
+ENROLMENT_DATA_YEAR: int = 2022
+ENROLMENT_STORE_FILE = "./data/final_data/enrolmentStore.json"
+FOLLOWUPS_CACHE_FILE = "./data/final_data/followups.json"
@@ -9,7 +9,8 @@ Do NOT run this from it's current location.
 
 from typing import Dict, List, Optional, Tuple
 from algorithms.objects.conditions import CompositeCondition
-from data.config import GRAPH_CACHE_FILE
+from algorithms.reachability import ReachabilityIndex
+from data.config import GRAPH_CACHE_FILE, REACHABILITY_CACHE_FILE
 from data.processors.load_conditions import construct_conditions_objects
 from data.utility.data_helpers import write_data
 
@@ -18,6 +19,7 @@ CONDITIONS: Dict[str, Optional[CompositeCondition]] = construct_conditions_objec
 def cache_graph():
     graph = construct_full_graph()
     write_data(graph, GRAPH_CACHE_FILE)
+    write_data(ReachabilityIndex.build(graph["outgoing_adjacency_list"]).to_json(), REACHABILITY_CACHE_FILE)
 
     return graph
 
@@ -32,9 +34,23 @@ def construct_full_graph():
 
     return {
             "incoming_adjacency_list": incoming_adj,
+            "outgoing_adjacency_list": outgoing_adjacency(incoming_adj),
     }
 
 
+def outgoing_adjacency(incoming_adj: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """
+    Inverts the incoming adjacency list, giving the courses which 'course'
+    can be used to satisfy
+    eg 1511 -> 1521, 1531, 2521
+    """
+    outgoing_adj: Dict[str, List[str]] = {}
+    for course, sources in incoming_adj.items():
+        for source in sources:
+            outgoing_adj.setdefault(source, []).append(course)
+    return outgoing_adj
+
+
 def incoming_list(course: str) -> List[str]:
     """
     Returns a list of courses which can be used to satisfy 'course'
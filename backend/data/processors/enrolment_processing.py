@@ -0,0 +1,133 @@
+"""
+Processes the scraped enrolment data into the followups table, so that
+`/followups/getFollowups` is a lookup rather than a set intersection per course.
+
+The `store` stage folds the latest scrape (a single year's worth of hashed
+zIDs, see `data.scrapers.enrolment_scraper`) into the enrolment store, which
+keeps every year's enrolments with the zIDs interned as integers.
+
+The `followups` stage then counts, for each (origin course, origin term), how
+many of its students took each course in the term(s) after it, across every
+year in the store, by intersecting the courses' sorted student ids. It keeps
+the most popular `FOLLOWUPS_TOP_K` followups.
+
+From `/backend`, run these as:
+    `python3 -m runprocessors --type enrolment --stage store`
+    `python3 -m runprocessors --type enrolment --stage followups`
+"""
+
+import os
+from typing import Dict, List, Tuple, TypedDict
+
+import numpy as np
+
+from data.config import (ENROLMENT_DATA_FILE, ENROLMENT_DATA_YEAR, ENROLMENT_STORE_FILE,
+                         FOLLOWUPS_CACHE_FILE)
+from data.utility.data_helpers import read_data, write_data
+
+# The number of followups kept for each (origin course, origin term)
+FOLLOWUPS_TOP_K = 50
+
+TERMS = ["T0", "T1", "T2", "T3"]
+
+
+class EnrolmentStore(TypedDict):
+    # student id -> hashed zID
+    students: List[str]
+    # year -> term -> course -> sorted ids of the students enrolled
+    years: Dict[str, Dict[str, Dict[str, List[int]]]]
+
+# origin course -> origin term -> [(followup course, { next term: number of students }), ...]
+FollowupsTable = Dict[str, Dict[str, List[Tuple[str, Dict[str, int]]]]]
+
+
+def next_terms(year: int, term: str) -> List[Tuple[int, str]]:
+    """
+    The (year, term)s which directly follow the given one. T3 is followed by
+    both the next year's summer term and T1, since most students skip summer.
+    """
+    if term == "T3":
+        return [(year + 1, "T0"), (year + 1, "T1")]
+    return [(year, TERMS[TERMS.index(term) + 1])]
+
+
+def process_enrolment_store() -> None:
+    store: EnrolmentStore = (
+        read_data(ENROLMENT_STORE_FILE) if os.path.exists(ENROLMENT_STORE_FILE)
+        else {"students": [], "years": {}}
+    )
+    write_data(
+        add_enrolment_year(store, ENROLMENT_DATA_YEAR, read_data(ENROLMENT_DATA_FILE)),
+        ENROLMENT_STORE_FILE
+    )
+
+def add_enrolment_year(
+    store: EnrolmentStore,
+    year: int,
+    enrolment_data: Dict[str, Dict[str, List[str]]]
+) -> EnrolmentStore:
+    """
+    Adds (or replaces) a year in the store, from a scrape of
+    course -> term -> hashed zIDs enrolled
+    """
+    students = list(store["students"])
+    student_ids = {student: student_id for student_id, student in enumerate(students)}
+    terms: Dict[str, Dict[str, List[int]]] = {}
+    for course, course_terms in sorted(enrolment_data.items()):
+        for term, enrolled in course_terms.items():
+            if not enrolled:
+                continue
+            for student in enrolled:
+                if student not in student_ids:
+                    student_ids[student] = len(students)
+                    students.append(student)
+            terms.setdefault(term, {})[course] = sorted({student_ids[student] for student in enrolled})
+
+    years = dict(store["years"])
+    years[str(year)] = {term: terms[term] for term in TERMS if term in terms}
+    return {"students": students, "years": dict(sorted(years.items()))}
+
+
+def process_followups() -> None:
+    write_data(build_followups(read_data(ENROLMENT_STORE_FILE)), FOLLOWUPS_CACHE_FILE)
+
+def build_followups(store: EnrolmentStore) -> FollowupsTable:
+    """ Builds the followups table from every year in the enrolment store """
+    # year -> term -> course -> the sorted ids of its students, as arrays to intersect
+    enrolments: Dict[int, Dict[str, Dict[str, np.ndarray]]] = {
+        int(year): {
+            term: {course: np.asarray(students, dtype=np.int32) for course, students in courses.items()}
+            for term, courses in terms.items()
+        }
+        for year, terms in store["years"].items()
+    }
+
+    # (origin course, origin term) -> followup course -> { next term: number of students }
+    counts: Dict[Tuple[str, str], Dict[str, Dict[str, int]]] = {}
+    for year, terms in enrolments.items():
+        for origin_term, origins in terms.items():
+            for next_year, next_term in next_terms(year, origin_term):
+                next_courses = enrolments.get(next_year, {}).get(next_term, {})
+                for origin, origin_students in origins.items():
+                    for followup, followup_students in next_courses.items():
+                        count = np.intersect1d(origin_students, followup_students, assume_unique=True).size
+                        if count:
+                            by_term = counts.setdefault((origin, origin_term), {}).setdefault(followup, {})
+                            by_term[next_term] = by_term.get(next_term, 0) + count
+
+    followups: FollowupsTable = {}
+    for origin_term in TERMS:
+        for origin in sorted(origin for origin, term in counts if term == origin_term):
+            top = sorted(
+                counts[origin, origin_term].items(),
+                key=lambda followup: (-sum(followup[1].values()), followup[0])
+            )[:FOLLOWUPS_TOP_K]
+            followups.setdefault(origin, {})[origin_term] = [
+                (course, dict(sorted(by_term.items()))) for course, by_term in top
+            ]
+    return followups
+
+
+if __name__ == "__main__":
+    process_enrolment_store()
+    process_followups()
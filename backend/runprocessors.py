@@ -15,6 +15,7 @@ from algorithms.cache.cache import (cache_equivalents, cache_exclusions, cache_h
 
 from algorithms.create_program import process_program_conditions
 from data.processors.cache_graph import cache_graph
+from data.processors.enrolment_processing import process_enrolment_store, process_followups
 from data.processors.load_conditions import cache_conditions_pkl_file
 from data.processors.log_broken import log_broken_conditions
 
@@ -52,7 +53,7 @@ parser.add_argument(
             program/specialisation/course --> scrape, format, process
             condition --> process, manual, tokenise, parsingErrors, pickle
             cache --> exclusion, handbook_note, mapping, program
-            enrolment --> scrape
+            enrolment --> scrape, store, followups
         """,
 )
 
@@ -138,6 +139,8 @@ run: dict[str, dict[str, Callable]] = {
     },
     "enrolment": {
         # "scrape": run_scrape_enrolment_data,
+        "store": process_enrolment_store,
+        "followups": process_followups,
     },
 }
 
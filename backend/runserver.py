@@ -2,20 +2,27 @@
 api and also run the files"""
 
 import argparse
+import logging
 import sys
 # https://github.com/encode/uvicorn/issues/998
 import uvicorn # type: ignore
 
-from server.database import overwrite_all
 from server.server import app
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "--overwrite",
         action="store_true",
         help="Inclusion of option will overwrite the database",
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="With --overwrite, reload every collection even if its data is unchanged",
+    )
 
     try:
         args = parser.parse_args()
@@ -24,6 +31,8 @@ if __name__ == "__main__":
         sys.exit(0)
 
     if args.overwrite:
-        overwrite_all()
+        # only imported when needed, since it needs the database's credentials
+        from server.database import overwrite_all
+        overwrite_all(force=args.force)
 
     uvicorn.run(app, host='0.0.0.0')
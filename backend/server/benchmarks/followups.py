@@ -0,0 +1,75 @@
+"""
+Compares serving followups out of the precomputed table against working them
+out per request from the enrolment store, the way `getFollowups` used to.
+
+For every origin term, prints the time per (course, term) over every course
+in the store: the table lookup takes the same time whatever the course's
+enrolments, while recomputing grows with them.
+
+Run from the backend directory with
+`python -m server.benchmarks.followups`
+(after `python -m runprocessors --type enrolment --stage all`).
+"""
+
+import statistics
+import time
+from typing import Callable, Dict
+
+from data.config import ENROLMENT_STORE_FILE
+from data.processors.enrolment_processing import TERMS, EnrolmentStore, next_terms
+from data.utility.data_helpers import read_data
+from server.routers.followups import FOLLOWUPS
+
+REPEATS = 200
+
+
+def lookup(course: str, term: str) -> Dict[str, Dict[str, int]]:
+    """ What `getFollowups` does now """
+    return dict(FOLLOWUPS.get().get(course, {}).get(term, {}))
+
+def recompute(store: EnrolmentStore, course: str, term: str) -> Dict[str, Dict[str, int]]:
+    """ Intersects the course's students with every course's in the following term(s) """
+    followups: Dict[str, Dict[str, int]] = {}
+    for year, terms in store["years"].items():
+        origin = set(terms.get(term, {}).get(course, []))
+        if not origin:
+            continue
+        for next_year, next_term in next_terms(int(year), term):
+            for followup, students in store["years"].get(str(next_year), {}).get(next_term, {}).items():
+                if count := len(origin & set(students)):
+                    counts = followups.setdefault(followup, {})
+                    counts[next_term] = counts.get(next_term, 0) + count
+    return dict(sorted(
+        followups.items(), key=lambda followup: (-sum(followup[1].values()), followup[0])
+    ))
+
+def us(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        func()
+    return (time.perf_counter() - start) / REPEATS * 1e6
+
+
+def main() -> None:
+    store: EnrolmentStore = read_data(ENROLMENT_STORE_FILE)
+    courses = sorted({
+        course for terms in store["years"].values() for enrolments in terms.values() for course in enrolments
+    })
+    FOLLOWUPS.load()
+
+    print(f"{len(courses)} courses, {len(store['students'])} students, years {', '.join(store['years'])}")
+    print(f"{'term':<6} {'lookup us (min/median/max)':>28} {'recompute us (min/median/max)':>31}")
+    for term in TERMS:
+        lookups, recomputes = [], []
+        for course in courses:
+            assert lookup(course, term) == recompute(store, course, term)
+            lookups.append(us(lambda: lookup(course, term)))
+            recomputes.append(us(lambda: recompute(store, course, term)))
+        print(
+            f"{term:<6} {min(lookups):>10.2f} {statistics.median(lookups):>8.2f} {max(lookups):>8.2f}"
+            f" {min(recomputes):>12.2f} {statistics.median(recomputes):>8.2f} {max(recomputes):>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Compares the default FastAPI response path against `server.responses` for
+the shapes of our largest responses, built from the local data files.
+
+For each payload, prints the CPU time to produce the body (validation and
+encoding) and its size uncompressed, gzipped and brotli'd.
+
+Run from the backend directory with `python -m server.benchmarks.responses`.
+"""
+
+import gzip
+import json
+import time
+from typing import Any, Callable, Type
+
+import brotli  # type: ignore
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from algorithms.objects.user import User
+from data.config import GRAPH_CACHE_FILE
+from data.utility.data_helpers import read_data
+from server.responses import FastJSONResponse
+from server.routers.model import (CACHED_HANDBOOK_NOTE, COMPILED_CONDITIONS, CONDITIONS,
+                                  CoursesState, Graph, ValidCoursesState)
+
+REPEATS = 20
+
+
+def default_body(model: Type[BaseModel], content: Any) -> bytes:
+    """ What FastAPI does with a `response_model`: validate, encode, dump """
+    validated = model.parse_obj(content)
+    return json.dumps(
+        jsonable_encoder(validated), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+def fast_body(content: Any) -> bytes:
+    return FastJSONResponse(content).body
+
+def cpu_ms(func: Callable[[], Any]) -> float:
+    start = time.process_time()
+    for _ in range(REPEATS):
+        func()
+    return (time.process_time() - start) / REPEATS * 1000
+
+
+def all_unlocked_payload(supressed: bool = False) -> dict:
+    user = User(read_data("./algorithms/tests/exampleUsers.json")["user3"])
+    state: dict[str, dict] = {
+        course: {
+            "is_accurate": CONDITIONS[course] is not None,
+            "unlocked": True,
+            "handbook_note": CACHED_HANDBOOK_NOTE.get(course, ""),
+            "warnings": warnings,
+        }
+        for course, warnings in COMPILED_CONDITIONS.get().evaluator(user).unlocked()
+    }
+    if supressed:
+        for course in state.values():
+            course["supressed"] = False
+    return {"courses_state": state}
+
+def graph_payload() -> dict:
+    incoming: dict[str, list[str]] = read_data(GRAPH_CACHE_FILE)["incoming_adjacency_list"]
+    return {
+        "edges": [
+            {"source": source, "target": target}
+            for target, sources in incoming.items() for source in sources
+        ],
+        "courses": list(incoming),
+    }
+
+
+def main() -> None:
+    payloads: list[tuple[str, Type[BaseModel], dict]] = [
+        ("getAllUnlocked", CoursesState, all_unlocked_payload()),
+        ("validateTermPlanner", ValidCoursesState, all_unlocked_payload(supressed=True)),
+        ("graph", Graph, graph_payload()),
+    ]
+    print(f"{'payload':<20} {'default ms':>10} {'fast ms':>8} {'bytes':>9} {'gzip':>8} {'gzip ms':>8} {'br':>8} {'br ms':>6}")
+    for name, model, content in payloads:
+        body = fast_body(content)
+        assert json.loads(body) == json.loads(default_body(model, content))
+        gzipped = gzip.compress(body, 6)
+        brotlied = brotli.compress(body, quality=4)
+        print(
+            f"{name:<20} {cpu_ms(lambda: default_body(model, content)):>10.2f} {cpu_ms(lambda: fast_body(content)):>8.2f}"
+            f" {len(body):>9} {len(gzipped):>8} {cpu_ms(lambda: gzip.compress(body, 6)):>8.2f}"
+            f" {len(brotlied):>8} {cpu_ms(lambda: brotli.compress(body, quality=4)):>6.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+A read-only, process-wide catalogue of every course known to the backend.
+
+The live year and every archived year are read out of the database exactly
+once. Each course code is resolved to the newest year it appears in, and
+enriched the same way that `/courses/getCourse` always has, so lookups are
+served straight out of a dict instead of round-tripping to mongo.
+"""
+
+import hashlib
+import json
+from contextlib import suppress
+from typing import Dict, Iterator, List, Optional
+
+from data.config import ARCHIVED_YEARS
+from server.datasets import dataset
+from server.repository import get_repository
+from server.routers.model import CACHED_HANDBOOK_NOTE, CONDITIONS
+from server.search_index import CourseSearchIndex
+
+
+class CourseCatalogue:
+    """
+    Holds the resolved course details for every course, as well as the raw
+    archived details for every (year, course) pair.
+
+    NOTE: `courses`, `archives` and `titles` are shared between all requests;
+    callers must copy anything out of them before mutating it.
+    """
+
+    def __init__(self, live_courses: list[dict], archives: dict[str, list[dict]]):
+        # year -> course code -> archived course details
+        self.archives: Dict[str, Dict[str, dict]] = {
+            year: {course["code"]: course for course in courses}
+            for year, courses in archives.items()
+        }
+
+        # course code -> fully resolved `getCourse` details
+        live: Dict[str, dict] = {course["code"]: course for course in live_courses}
+        self.courses: Dict[str, dict] = {
+            code: _resolve_course(course, is_legacy=False) for code, course in live.items()
+        }
+
+        for year in sorted(self.archives.keys(), reverse=True):
+            for code, course in self.archives[year].items():
+                if code not in self.courses:
+                    self.courses[code] = _resolve_course(course, is_legacy=True)
+
+        # course code -> course title, live courses first
+        self.titles: Dict[str, str] = {
+            code: course["title"] for code, course in self.courses.items()
+        }
+        self.search_index = CourseSearchIndex(self.titles)
+
+        self.dump = CourseDump([
+            _dump_course(course, is_legacy=False) for course in live.values()
+        ] + [
+            _dump_course(self._newest_archived(code), is_legacy=True)
+            for code in self.courses if self.courses[code]["is_legacy"]
+        ])
+
+    def get_course(self, code: str) -> Optional[dict]:
+        """ Returns the newest details of the given course, or None if it is unknown """
+        course = self.courses.get(code)
+        return dict(course) if course is not None else None
+
+    def get_legacy_course(self, year: str, code: str) -> Optional[dict]:
+        """ Returns the archived details of a course for the given year, or None """
+        course = self.archives.get(str(year), {}).get(code)
+        return dict(course) if course is not None else None
+
+    def get_legacy_year(self, year: str) -> Dict[str, dict]:
+        """ Returns all the archived courses for the given year (empty if not archived) """
+        return self.archives.get(str(year), {})
+
+    def _newest_archived(self, code: str) -> dict:
+        """ The archived details of a course from the newest year that has it """
+        return next(
+            self.archives[year][code]
+            for year in sorted(self.archives.keys(), reverse=True)
+            if code in self.archives[year]
+        )
+
+
+class CourseDump:
+    """
+    The pre-serialised body of `/courses/dump`. Every course is encoded once
+    up front, so each request only has to stream the stored bytes back out.
+    """
+
+    # number of courses sent per chunk of a streamed response
+    CHUNK_SIZE = 256
+
+    def __init__(self, courses: List[dict]):
+        self.encoded: List[bytes] = [
+            json.dumps(course, ensure_ascii=False, separators=(",", ":")).encode("utf8")
+            for course in courses
+        ]
+        digest = hashlib.sha256()
+        for course in self.encoded:
+            digest.update(course)
+            digest.update(b"\n")
+        # each representation gets its own tag, so caches never serve one for the other
+        self.etags = {
+            "json": f'"{digest.hexdigest()}"',
+            "ndjson": f'"{digest.hexdigest()}-ndjson"',
+        }
+
+    def iter_json(self) -> Iterator[bytes]:
+        """ Yields the courses as chunks of a single json list """
+        yield b"["
+        for start in range(0, len(self.encoded), self.CHUNK_SIZE):
+            prefix = b"," if start else b""
+            yield prefix + b",".join(self.encoded[start:start + self.CHUNK_SIZE])
+        yield b"]"
+
+    def iter_ndjson(self) -> Iterator[bytes]:
+        """ Yields the courses as chunks of newline delimited json """
+        for start in range(0, len(self.encoded), self.CHUNK_SIZE):
+            yield b"".join(
+                course + b"\n" for course in self.encoded[start:start + self.CHUNK_SIZE]
+            )
+
+
+def _dump_course(course: dict, is_legacy: bool) -> dict:
+    """ Formats a course straight from the database for `/courses/dump` """
+    result = dict(course)
+    result["is_legacy"] = is_legacy
+    result.setdefault("school", None)
+    if isinstance(result.get("exclusions"), dict):
+        result["exclusions"] = dict(result["exclusions"])
+        with suppress(KeyError):
+            del result["exclusions"]["leftover_plaintext"]
+    return result
+
+
+def _resolve_course(course: dict, is_legacy: bool) -> dict:
+    """
+    Adds the same additional details that `/courses/getCourse` adds to a
+    course straight from the database
+    """
+    result = _dump_course(course, is_legacy)
+    if is_legacy:
+        result.setdefault("raw_requirements", "")
+    result["is_accurate"] = CONDITIONS.get(result["code"]) is not None
+    result["handbook_note"] = CACHED_HANDBOOK_NOTE.get(result["code"], "")
+    return result
+
+
+def load_catalogue() -> CourseCatalogue:
+    """ Reads the live and archived courses out of the repository """
+    repository = get_repository()
+    live_courses = repository.courses()
+    archives = {
+        str(year): repository.archived_courses(year)
+        for year in ARCHIVED_YEARS
+    }
+    return CourseCatalogue(live_courses, archives)
+
+CATALOGUE = dataset("catalogue", load_catalogue)
+
+def get_catalogue() -> CourseCatalogue:
+    """ Returns the process-wide course catalogue """
+    return CATALOGUE.get()
@@ -0,0 +1,98 @@
+"""
+Conditional GET support for the routes that only depend on handbook data.
+
+Everything those routes return is derived from the data pipeline's output by
+the server's code, so a response can only change when either of those
+changes. The data version is a hash over every file the pipeline writes and
+the code's version (`APP_VERSION`, or else a hash over the server's source),
+and each response's ETag is derived from the data version and the request's
+URL. Requests carrying a matching `If-None-Match` get a `304 Not Modified`
+before the route does any work.
+"""
+
+import hashlib
+import os
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from fastapi import HTTPException, Request, Response
+
+from server.config import APP_VERSION, FINAL_DATA_PATH
+from server.datasets import dataset
+
+# Everything the data pipeline produces which the server reads from
+DATA_VERSION_PATHS = [
+    FINAL_DATA_PATH,
+    "./algorithms/cache/",
+    "./data/scrapers/genedPureRaw.json",
+]
+
+# The code which turns that data into responses, hashed when `APP_VERSION` is unset
+CODE_VERSION_PATHS = [
+    "./server/",
+    "./algorithms/",
+    "./data/config.py",
+    "./data/utility/",
+]
+
+# Clients and caches may store responses, but must revalidate them before reuse
+CACHE_CONTROL = "public, no-cache"
+
+
+class DataVersion(NamedTuple):
+    digest: str
+
+
+def _files(paths: List[str], include: Callable[[str], bool]) -> Iterator[str]:
+    """ Every file under `paths` (skipping tests and caches) which is included, in a stable order """
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if d not in ("__pycache__", "tests"))
+            yield from (os.path.join(root, name) for name in sorted(files) if include(name))
+
+def _hash_files(digest: "hashlib._Hash", file_names: Iterator[str]) -> None:
+    for file_name in file_names:
+        digest.update(file_name.encode("utf8") + b"\0")
+        with open(file_name, "rb") as file:
+            digest.update(hashlib.sha256(file.read()).digest())
+
+def load_data_version() -> DataVersion:
+    """ Hashes the code's version and the contents of every data file """
+    digest = hashlib.sha256()
+    if APP_VERSION:
+        digest.update(APP_VERSION.encode("utf8") + b"\0")
+    else:
+        _hash_files(digest, _files(CODE_VERSION_PATHS, lambda name: name.endswith(".py")))
+    _hash_files(digest, _files(DATA_VERSION_PATHS, lambda name: not name.endswith((".py", ".pyc"))))
+    return DataVersion(digest.hexdigest()[:16])
+
+DATA_VERSION = dataset("data_version", load_data_version)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """ Whether an `If-None-Match` header matches the given (strong) ETag """
+    if if_none_match is None:
+        return False
+    return if_none_match.strip() == "*" or etag in (
+        tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+    )
+
+async def conditional_get(request: Request, response: Response) -> None:
+    """
+    Route dependency which adds `ETag` and `Cache-Control` to the response,
+    or raises a 304 if the client's copy is still current.
+    It is async so that it runs on the event loop rather than taking a thread.
+    """
+    version = await DATA_VERSION.get_async()
+    url = request.url.path + (f"?{request.url.query}" if request.url.query else "")
+    etag = f'"{version.digest}-{hashlib.sha256(url.encode("utf8")).hexdigest()[:16]}"'
+    headers: Dict[str, str] = {
+        "ETag": etag,
+        "Cache-Control": CACHE_CONTROL,
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers=headers)
+
+    response.headers.update(headers)
@@ -1,7 +1,28 @@
 """Config for ther server and its routes. Mainly file paths"""
 
+import os
+
 URI = "mongodb://mongodb:27017/?readPreference=primary&appname=MongoDB%20Compass&directConnection=true&ssl=false"
 
 FINAL_DATA_PATH = "./data/final_data/"
 
 ARCHIVED_DATA_PATH = "./data/final_data/archive/processed/"
+
+# Identifies the deployed code in the ETags of cacheable responses. If unset,
+# a hash of the server's source files is used instead
+APP_VERSION = os.environ.get("APP_VERSION")
+
+# Where the handbook data is read from: "mongo" (the database), or "memory"
+# (straight from the files under FINAL_DATA_PATH, without a database)
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "mongo")
+
+# MongoDB connection pool and timeouts; each can be overridden from the environment
+MONGODB_MAX_POOL_SIZE = int(os.environ.get("MONGODB_MAX_POOL_SIZE", 32))
+MONGODB_MIN_POOL_SIZE = int(os.environ.get("MONGODB_MIN_POOL_SIZE", 2))
+MONGODB_CONNECT_TIMEOUT_MS = int(os.environ.get("MONGODB_CONNECT_TIMEOUT_MS", 5000))
+MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get("MONGODB_SERVER_SELECTION_TIMEOUT_MS", 5000))
+MONGODB_SOCKET_TIMEOUT_MS = int(os.environ.get("MONGODB_SOCKET_TIMEOUT_MS", 30000))
+# how long a query waits for a free connection once all MONGODB_MAX_POOL_SIZE are in use
+MONGODB_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get("MONGODB_WAIT_QUEUE_TIMEOUT_MS", 5000))
+# how many times to try reaching the database on startup, backing off exponentially
+MONGODB_CONNECT_ATTEMPTS = int(os.environ.get("MONGODB_CONNECT_ATTEMPTS", 5))
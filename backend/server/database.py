@@ -5,22 +5,41 @@ initialisation.
 NOTE: The helper functions must be run from the backend directory due to their paths
 """
 
+import asyncio
+import functools
+import hashlib
+import itertools
 import json
 import os
-from sys import exit
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Sequence, TypeVar
 
+import pymongo
 from data.config import ARCHIVED_YEARS
-from pymongo import MongoClient
-
-from server.config import ARCHIVED_DATA_PATH, FINAL_DATA_PATH
-
-# Export these as needed
-try:
-    client: MongoClient = MongoClient(f'mongodb://{os.environ["MONGODB_USERNAME"]}:{os.environ["MONGODB_PASSWORD"]}@{os.environ["MONGODB_SERVICE_HOSTNAME"]}:27017')
-    print('Connected to database.')
-except: # pylint: disable=bare-except
-    print("Unable to connect to database.")
-    exit(1)
+from pymongo import ASCENDING, IndexModel, MongoClient
+from pymongo.database import Database
+from pymongo.errors import PyMongoError
+
+from server.config import (ARCHIVED_DATA_PATH, FINAL_DATA_PATH, MONGODB_CONNECT_ATTEMPTS,
+                           MONGODB_CONNECT_TIMEOUT_MS, MONGODB_MAX_POOL_SIZE, MONGODB_MIN_POOL_SIZE,
+                           MONGODB_SERVER_SELECTION_TIMEOUT_MS, MONGODB_SOCKET_TIMEOUT_MS,
+                           MONGODB_WAIT_QUEUE_TIMEOUT_MS)
+
+T = TypeVar("T")
+
+# Export these as needed.
+# The client only connects on first use (see `connect`), so importing this never blocks
+client: MongoClient = MongoClient(
+    f'mongodb://{os.environ["MONGODB_USERNAME"]}:{os.environ["MONGODB_PASSWORD"]}@{os.environ["MONGODB_SERVICE_HOSTNAME"]}:27017',
+    connect=False,
+    maxPoolSize=MONGODB_MAX_POOL_SIZE,
+    minPoolSize=MONGODB_MIN_POOL_SIZE,
+    connectTimeoutMS=MONGODB_CONNECT_TIMEOUT_MS,
+    serverSelectionTimeoutMS=MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+    socketTimeoutMS=MONGODB_SOCKET_TIMEOUT_MS,
+    waitQueueTimeoutMS=MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+)
 
 db = client["Main"]
 programsCOL = db["Programs"]
@@ -29,46 +48,125 @@ coursesCOL = db["Courses"]
 
 archivesDB = client["Archives"]
 
+# Blocking database calls made from async code run here, so they never hold up
+# the event loop or take threads from the routes' threadpool. Requests never
+# query the database (they read the in-memory datasets), so only the health
+# probe uses this
+_executor = ThreadPoolExecutor(max_workers=MONGODB_MAX_POOL_SIZE, thread_name_prefix="mongo")
+
 
-def overwrite_collection(collection_name):
+def connect(attempts: int = MONGODB_CONNECT_ATTEMPTS) -> None:
+    """
+    Waits until the database is reachable, retrying with exponential backoff.
+    Raises the last error if it is still unreachable after `attempts` tries.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            client.admin.command("ping")
+            print("Connected to database.")
+            return
+        except PyMongoError as e:
+            if attempt == attempts:
+                print("Unable to connect to database.")
+                raise
+            delay = 2 ** (attempt - 1)
+            print(f"Unable to connect to database ({e}), retrying in {delay}s")
+            time.sleep(delay)
+
+def ping(timeout: float = 1.0) -> bool:
+    """ Whether the database answers a ping within `timeout` seconds """
+    try:
+        with pymongo.timeout(timeout):
+            client.admin.command("ping")
+        return True
+    except PyMongoError:
+        return False
+
+async def run_query(func: Callable[..., T], *args: Any) -> T:
+    """ Runs a blocking database call (e.g. `coursesCOL.find_one`) without blocking the event loop """
+    return await asyncio.get_running_loop().run_in_executor(_executor, functools.partial(func, *args))
+
+async def database_healthy() -> bool:
+    """ The health probe: whether the database is currently reachable """
+    return await run_query(ping)
+
+
+# Documents are inserted into the staging collections this many at a time
+INSERT_BATCH_SIZE = 1000
+
+# Every query looks documents up by their code, and the archived years are also filtered by term
+CODE_INDEXES = [IndexModel([("code", ASCENDING)], unique=True)]
+ARCHIVE_INDEXES = CODE_INDEXES + [IndexModel([("terms", ASCENDING)])]
+
+# Records the hash of the source file (and indexes) that each collection was last loaded from
+loadsCOL = db["Loads"]
+
+
+def load_collection(database: Database, collection_name: str, file_name: str,
+                    indexes: Sequence[IndexModel] = (), force: bool = False) -> None:
+    """
+    Replaces a collection with the documents of a json file (a dict of documents).
+
+    The documents are loaded into a staging collection and indexed there, and
+    only then renamed over the live collection, so readers never see it empty
+    or partially loaded. The load is skipped entirely if the file and indexes
+    are unchanged since the last one, unless `force` is set.
+    """
+    with open(file_name, "rb") as f:
+        contents = f.read()
+    source_hash = hashlib.sha256(contents)
+    for index in indexes:
+        source_hash.update(repr(sorted(index.document.items())).encode("utf8"))
+    load_id = f"{database.name}.{collection_name}"
+    last_load = loadsCOL.find_one({"_id": load_id})
+    if (
+        not force
+        and last_load is not None and last_load["source_hash"] == source_hash.hexdigest()
+        and collection_name in database.list_collection_names()
+    ):
+        print(f"{load_id} is up to date")
+        return
+
+    staging = database[f"{collection_name}_staging"]
+    staging.drop()
+    documents = iter(json.loads(contents).values())
+    while batch := list(itertools.islice(documents, INSERT_BATCH_SIZE)):
+        staging.insert_many(batch, ordered=False)
+    if indexes:
+        staging.create_indexes(list(indexes))
+    # renaming within a database is atomic; the old collection is dropped with it
+    staging.rename(collection_name, dropTarget=True)
+
+    loadsCOL.replace_one(
+        {"_id": load_id}, {"_id": load_id, "source_hash": source_hash.hexdigest()}, upsert=True
+    )
+    print(f"Finished overwriting {load_id}")
+
+
+def overwrite_collection(collection_name: str, force: bool = False) -> None:
     """Overwrites the specific database via reading from the json files.
     Collection names can be: Programs, Specialisations, Courses"""
     file_name = FINAL_DATA_PATH + collection_name.lower() + "Processed.json"
+    try:
+        load_collection(db, collection_name, file_name, CODE_INDEXES, force)
+    except (KeyError, IOError, OSError, PyMongoError):
+        print(f"Failed to load and overwrite {collection_name}")
 
-    with open(file_name, encoding="utf8") as f:
-        try:
-            db[collection_name].drop()
-
-            file_data = json.load(f)
-            for key in file_data:
-                db[collection_name].insert_one(file_data[key])
 
-            print(f"Finished overwriting {collection_name}")
-        except (KeyError, IOError, OSError):
-            print(f"Failed to load and overwrite {collection_name}")
-
-
-def overwrite_archives():
+def overwrite_archives(force: bool = False) -> None:
     """Overwrite all the archived data for all the years that we have archived"""
     for year in ARCHIVED_YEARS:
         file_name = ARCHIVED_DATA_PATH + str(year) + ".json"
-
-        with open(file_name, encoding="utf8") as f:
-            try:
-                archivesDB[str(year)].drop()
-
-                file_data = json.load(f)
-                for key in file_data:
-                    archivesDB[str(year)].insert_one(file_data[key])
-
-                print(f"Finished overwriting {year} archive")
-            except (KeyError, IOError, OSError):
-                print(f"Failed to load and overwrite {year} archive")
+        try:
+            load_collection(archivesDB, str(year), file_name, ARCHIVE_INDEXES, force)
+        except (KeyError, IOError, OSError, PyMongoError):
+            print(f"Failed to load and overwrite {year} archive")
 
 
-def overwrite_all():
+def overwrite_all(force: bool = False) -> None:
     """Singular execution point to overwrite the entire database including the archives"""
-    overwrite_collection("Courses")
-    overwrite_collection("Specialisations")
-    overwrite_collection("Programs")
-    overwrite_archives()
+    connect()
+    overwrite_collection("Courses", force)
+    overwrite_collection("Specialisations", force)
+    overwrite_collection("Programs", force)
+    overwrite_archives(force)
@@ -0,0 +1,127 @@
+"""
+Loads the data the server needs to answer requests.
+
+Each module owning a piece of data registers it here with `dataset`, and gets
+back a typed handle it reads the data through. All registered datasets are
+loaded together (in parallel) when the server starts up, so no request ever
+has to pay for loading them. A dataset that is read before startup has
+finished is loaded on the spot instead; async routes wait for theirs with the
+`loaded` dependency, so that they never block the event loop on a load.
+"""
+
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, Generic, List, Optional, TypeVar
+
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetStats(BaseModel):
+    name: str
+    seconds: float
+    bytes: int
+
+
+class Dataset(Generic[T]):
+    """ A named piece of data which is loaded once and then shared read-only """
+
+    def __init__(self, name: str, loader: Callable[[], T]):
+        self.name = name
+        self.loader = loader
+        self.stats: Optional[DatasetStats] = None
+        self._value: Optional[T] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.stats is not None
+
+    def load(self) -> DatasetStats:
+        """ Loads the dataset if it has not been loaded yet """
+        with self._lock:
+            if self.stats is None:
+                start = time.perf_counter()
+                self._value = self.loader()
+                seconds = time.perf_counter() - start
+                self.stats = DatasetStats(name=self.name, seconds=seconds, bytes=deep_sizeof(self._value))
+                logger.info(
+                    "Loaded %s in %.3fs (%.1f MiB)", self.name, seconds, self.stats.bytes / 2 ** 20
+                )
+        return self.stats
+
+    def get(self) -> T:
+        """ Returns the data, loading it first if needed """
+        if self.stats is None:
+            self.load()
+        return self._value  # type: ignore
+
+    async def get_async(self) -> T:
+        """ `get` for the event loop: waits for the data on a worker thread if it is not loaded yet """
+        if self.stats is None:
+            await run_in_threadpool(self.load)
+        return self._value  # type: ignore
+
+
+DATASETS: Dict[str, Dataset] = {}
+
+def dataset(name: str, loader: Callable[[], T]) -> Dataset[T]:
+    """ Registers a dataset to be loaded on startup, and returns its handle """
+    if name in DATASETS:
+        raise ValueError(f"dataset '{name}' is already registered")
+    handle = Dataset(name, loader)
+    DATASETS[name] = handle
+    return handle
+
+def load_datasets(max_workers: Optional[int] = None) -> List[DatasetStats]:
+    """ Loads every registered dataset in parallel """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="datasets") as executor:
+        stats = list(executor.map(Dataset.load, DATASETS.values()))
+    logger.info("Loaded %d datasets in %.3fs", len(stats), time.perf_counter() - start)
+    return stats
+
+def loaded(*handles: Dataset) -> Callable[[], Awaitable[None]]:
+    """ Route dependency for async routes, which waits until the given datasets are loaded """
+    async def dependency() -> None:
+        for handle in handles:
+            await handle.get_async()
+    return dependency
+
+def datasets_ready() -> bool:
+    """ Whether every registered dataset has been loaded """
+    return all(handle.loaded for handle in DATASETS.values())
+
+
+def deep_sizeof(obj: Any) -> int:
+    """
+    Approximates the memory used by an object and everything it refers to.
+    Shared objects are only counted once.
+    """
+    seen: set[int] = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        curr = stack.pop()
+        if id(curr) in seen or isinstance(curr, type):
+            continue
+        seen.add(id(curr))
+        size += sys.getsizeof(curr)
+        if isinstance(curr, (dict, MappingProxyType)):
+            stack.extend(curr.keys())
+            stack.extend(curr.values())
+        elif isinstance(curr, (list, tuple, set, frozenset)):
+            stack.extend(curr)
+        elif hasattr(curr, "__dict__"):
+            stack.append(vars(curr))
+        elif hasattr(curr, "__slots__"):
+            stack.extend(getattr(curr, slot) for slot in curr.__slots__ if hasattr(curr, slot))
+    return size
@@ -0,0 +1,22 @@
+"""
+Every program and specialisation in the handbook, read once from the storage
+backend and shared by the routers which serve them.
+"""
+
+from typing import Dict, cast
+
+from data.processors.models import Program, Specialisation
+from server.datasets import dataset
+from server.repository import get_repository
+
+
+def load_programs() -> Dict[str, Program]:
+    """ Every program, keyed by code """
+    return {program["code"]: cast(Program, program) for program in get_repository().programs()}
+
+def load_specialisations() -> Dict[str, Specialisation]:
+    """ Every specialisation, keyed by code """
+    return {spec["code"]: cast(Specialisation, spec) for spec in get_repository().specialisations()}
+
+PROGRAMS = dataset("programs", load_programs)
+SPECIALISATIONS = dataset("specialisations", load_specialisations)
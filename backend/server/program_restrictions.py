@@ -0,0 +1,77 @@
+"""
+A process-wide, read-only registry of the program restrictions.
+
+The restrictions are unpickled once and shared between every request. The
+artefact is re-checked at most every `CHECK_INTERVAL` seconds and reloaded if
+it has been rewritten with different contents.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+from typing import Dict, Optional
+
+from algorithms.create_program import PROGRAM_RESTRICTIONS_PICKLE_FILE
+from algorithms.objects.program_restrictions import NoRestriction, ProgramRestriction
+from algorithms.objects.user import User
+from server.datasets import dataset
+
+# seconds between checks of whether the pickle file has changed
+CHECK_INTERVAL = 5.0
+
+
+class ProgramRestrictionRegistry:
+    """ Maps program codes to their restrictions """
+
+    def __init__(self, path: str = PROGRAM_RESTRICTIONS_PICKLE_FILE):
+        self.path = path
+        self.restrictions: Dict[str, ProgramRestriction] = {}
+        self.digest: Optional[str] = None
+        self._stat: Optional[tuple[float, int]] = None
+        self._last_checked = 0.0
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, ProgramRestriction]:
+        """ (Re)loads the restrictions if the file's contents have changed """
+        with self._lock:
+            stat = os.stat(self.path)
+            self._last_checked = time.monotonic()
+            if (stat.st_mtime, stat.st_size) == self._stat:
+                return self.restrictions
+
+            with open(self.path, "rb") as file:
+                contents = file.read()
+            digest = hashlib.sha256(contents).hexdigest()
+            if digest != self.digest:
+                self.restrictions = pickle.loads(contents)
+                self.digest = digest
+            self._stat = (stat.st_mtime, stat.st_size)
+            return self.restrictions
+
+    def get(self, program_code: Optional[str]) -> Optional[ProgramRestriction]:
+        """ Returns the restriction for the given program code, if there is one """
+        if self.digest is None or time.monotonic() - self._last_checked > CHECK_INTERVAL:
+            self.load()
+        if not program_code:
+            return None
+        return self.restrictions.get(program_code)
+
+    def validate_course_allowed(self, user: User, course: str) -> bool:
+        """ Returns whether the user's program allows them to take the course """
+        return (self.get(user.program) or NoRestriction()).validate_course_allowed(user, course)
+
+
+PROGRAM_RESTRICTIONS = ProgramRestrictionRegistry()
+
+def load_program_restrictions() -> ProgramRestrictionRegistry:
+    """
+    Primes the registry on startup. The dataset holds the registry itself
+    rather than the restrictions it loaded, so reading it always sees the
+    latest reload.
+    """
+    PROGRAM_RESTRICTIONS.load()
+    return PROGRAM_RESTRICTIONS
+
+dataset("program_restrictions", load_program_restrictions)
@@ -0,0 +1,157 @@
+"""
+Where the server reads its courses, programs, specialisations and archived
+courses from.
+
+`MongoRepository` reads them out of the database. `MemoryRepository` reads
+them straight from the data pipeline's output (the same files the database
+is loaded from), so the server can run without a database at all. Which one
+is used is chosen by `STORAGE_BACKEND` in `server.config`.
+"""
+
+import json
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence, Tuple
+
+from data.config import ARCHIVED_YEARS
+from server.config import ARCHIVED_DATA_PATH, FINAL_DATA_PATH, STORAGE_BACKEND
+
+
+class Repository(ABC):
+    """
+    Read access to the handbook data. Documents are returned without mongo's `_id`.
+    NOTE: documents may be shared between callers; they must not be mutated.
+    """
+
+    # the backend's name, as given to `STORAGE_BACKEND`
+    name: str
+
+    def connect(self) -> None:
+        """ Waits until the storage is available """
+
+    async def healthy(self) -> bool:
+        """ Whether the storage is currently available """
+        return True
+
+    @abstractmethod
+    def courses(self) -> List[dict]:
+        """ Every course in the live year """
+
+    @abstractmethod
+    def programs(self) -> List[dict]:
+        """ Every program """
+
+    @abstractmethod
+    def specialisations(self) -> List[dict]:
+        """ Every specialisation """
+
+    @abstractmethod
+    def archived_courses(self, year: int | str) -> List[dict]:
+        """ Every course in an archived year (empty if the year is not archived) """
+
+
+class MongoRepository(Repository):
+    """ Reads everything out of the database """
+
+    name = "mongo"
+
+    def __init__(self) -> None:
+        # only imported once this backend is used, since it needs the database's credentials
+        from server import database
+        self._database = database
+        self._courses = database.coursesCOL
+        self._programs = database.programsCOL
+        self._specialisations = database.specialisationsCOL
+        self._archives = database.archivesDB
+
+    def connect(self) -> None:
+        self._database.connect()
+
+    async def healthy(self) -> bool:
+        return await self._database.database_healthy()
+
+    def courses(self) -> List[dict]:
+        return list(self._courses.find({}, {"_id": 0}))
+
+    def programs(self) -> List[dict]:
+        return list(self._programs.find({}, {"_id": 0}))
+
+    def specialisations(self) -> List[dict]:
+        return list(self._specialisations.find({}, {"_id": 0}))
+
+    def archived_courses(self, year: int | str) -> List[dict]:
+        return list(self._archives[str(year)].find({}, {"_id": 0}))
+
+
+class MemoryRepository(Repository):
+    """ Reads everything once from the data pipeline's output. Immutable once loaded. """
+
+    name = "memory"
+
+    def __init__(self, final_data_path: str = FINAL_DATA_PATH,
+                 archived_data_path: str = ARCHIVED_DATA_PATH, archived_years: Sequence[int] = ARCHIVED_YEARS):
+        self._courses = _read_documents(final_data_path + "coursesProcessed.json")
+        self._programs = _read_documents(final_data_path + "programsProcessed.json")
+        self._specialisations = _read_documents(final_data_path + "specialisationsProcessed.json")
+        # year -> documents
+        self._archives = {
+            str(year): _read_documents(f"{archived_data_path}{year}.json")
+            for year in archived_years
+        }
+
+    def courses(self) -> List[dict]:
+        return list(self._courses)
+
+    def programs(self) -> List[dict]:
+        return list(self._programs)
+
+    def specialisations(self) -> List[dict]:
+        return list(self._specialisations)
+
+    def archived_courses(self, year: int | str) -> List[dict]:
+        return list(self._archives.get(str(year), ()))
+
+
+def _read_documents(file_name: str) -> Tuple[dict, ...]:
+    """
+    Reads a pipeline output file (a dict of documents, keyed by code).
+    Unlike `read_data`, a missing file raises rather than exiting, so that
+    the server's startup can report it.
+    """
+    try:
+        with open(file_name, encoding="utf8") as file:
+            return tuple(json.load(file).values())
+    except FileNotFoundError as e:
+        raise FileNotFoundError(
+            f"The memory storage backend needs {file_name}, which the data pipeline has not produced"
+        ) from e
+
+
+BACKENDS = {
+    "mongo": MongoRepository,
+    "memory": MemoryRepository,
+}
+
+def load_repository(backend: Optional[str] = None) -> Repository:
+    """ The named backend, or else the one chosen by `STORAGE_BACKEND` """
+    backend = backend or STORAGE_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown STORAGE_BACKEND '{backend}', expected one of {', '.join(BACKENDS)}"
+        )
+    return BACKENDS[backend]()
+
+
+_repository: Optional[Repository] = None
+_repository_lock = threading.Lock()
+
+def get_repository() -> Repository:
+    """
+    Returns the process-wide repository, creating it on first use. It is not
+    a dataset, since it holds the storage's client rather than data.
+    """
+    global _repository  # pylint: disable=global-statement
+    with _repository_lock:
+        if _repository is None:
+            _repository = load_repository()
+        return _repository
@@ -1,23 +1,27 @@
 """
 APIs for the /courses/ route.
 """
-from contextlib import suppress
-import pickle
+import functools
+import heapq
 import re
-from typing import Dict, List, Mapping, Optional, Set, Tuple
-from algorithms.objects.program_restrictions import NoRestriction
+from typing import Dict, Iterable, List, Literal, Mapping, NamedTuple, Optional, Tuple
 from algorithms.objects.user import User
-from data.config import ARCHIVED_YEARS, GRAPH_CACHE_FILE, LIVE_YEAR
+from algorithms.reachability import ReachabilityIndex
+from data.config import ARCHIVED_YEARS, GRAPH_CACHE_FILE, LIVE_YEAR, REACHABILITY_CACHE_FILE
 from data.utility.data_helpers import read_data
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 from fuzzywuzzy import fuzz # type: ignore
-from server.database import archivesDB, coursesCOL
-from server.routers.model import (CACHED_HANDBOOK_NOTE, CONDITIONS, CourseCodes,
-                                  CourseDetails, CoursesState, CoursesPath,
+from server.catalogue import CATALOGUE, get_catalogue
+from server.conditional_get import conditional_get, etag_matches
+from server.datasets import Dataset, dataset, loaded
+from server.program_restrictions import PROGRAM_RESTRICTIONS
+from server.responses import compress, fast_json
+from server.routers.model import (CACHED_HANDBOOK_NOTE, COMPILED_CONDITIONS, CONDITIONS, CourseCodes,
+                                  CourseDetails, CoursesDetails, CoursesRequest, CoursesState, CoursesPath,
                                   CoursesUnlockedWhenTaken, ProgramCourses, TermsList,
                                   UserData, TermsOffered, CoursesPathDict)
 from server.routers.utility import get_core_courses, map_suppressed_errors
-from algorithms.create_program import PROGRAM_RESTRICTIONS_PICKLE_FILE
 from algorithms.objects.program_restrictions import ProgramRestriction
 
 
@@ -26,37 +30,16 @@ router = APIRouter(
     tags=["courses"],
 )
 
-# TODO: would prefer to initialise ALL_COURSES here but that fails on CI for some reason
-ALL_COURSES: Optional[Dict[str, str]] = None
-CODE_MAPPING: Dict = read_data("data/utility/programCodeMappings.json")["title_to_code"]
-GRAPH: Dict[str, Dict[str, List[str]]] = read_data(GRAPH_CACHE_FILE)
-INCOMING_ADJACENCY: Dict[str, List[str]] = GRAPH.get("incoming_adjacency_list", {})
+GRAPH: Dataset[Dict[str, Dict[str, List[str]]]] = dataset("graph", lambda: read_data(GRAPH_CACHE_FILE))
 
 def fetch_all_courses() -> Dict[str, str]:
     """
     Returns a dictionary of all courses as a key-val pair with:
         key: course code
         value: course_title
+    NOTE: this is shared with every other request - do not mutate it
     """
-    # TODO: with actual bootstrapping, this should be done once and cached
-    # without giving anyone else the ability to access the global
-    # directly
-    global ALL_COURSES
-    if ALL_COURSES is not None:
-        return ALL_COURSES
-
-    courses = {}
-    for course in coursesCOL.find():
-        courses[course["code"]] = course["title"]
-
-    for year in sorted(ARCHIVED_YEARS, reverse=True):
-        for course in archivesDB[str(year)].find():
-            if course["code"] not in courses:
-                courses[course["code"]] = course["title"]
-
-    ALL_COURSES = courses
-
-    return ALL_COURSES
+    return get_catalogue().titles
 
 
 def fix_user_data(userData: dict):
@@ -66,8 +49,9 @@ def fix_user_data(userData: dict):
         for course in userData["courses"]
         if not isinstance(userData["courses"][course], list)
     ]
+    details = resolve_courses_or_raise(coursesWithoutUoc)
     filledInCourses = {
-        course: [get_course(course)["UOC"], userData["courses"][course]]
+        course: [details[course]["UOC"], userData["courses"][course]]
         for course in coursesWithoutUoc
     }
     userData["courses"].update(filledInCourses)
@@ -85,42 +69,46 @@ def api_index() -> str:
 def get_jsonified_course(courseCode: str) -> str:
     return str(CONDITIONS[courseCode])
 
-@router.get("/dump")
-def get_courses() -> list[Dict]:
+@router.get(
+    "/dump",
+    responses={
+        200: {
+            "description": "Returns every course, as a json list or as newline delimited json",
+            "content": {"application/json": {}, "application/x-ndjson": {}},
+        },
+        304: {"description": "The dump has not changed since the given ETag"},
+    },
+)
+@compress()
+def get_courses(
+    fmt: Literal["json", "ndjson"] = Query(default="json", alias="format"),
+    accept: Optional[str] = Header(default=None),
+    if_none_match: Optional[str] = Header(default=None),
+) -> Response:
     """
     Gets all courses in the database.
     (For CSElectives)
-    """
-    
-    def generate_course(course, is_legacy):
-        course["is_legacy"] = is_legacy
-        course.setdefault("school", None)
-        del course["_id"]
-        with suppress(KeyError):
-            del course["exclusions"]["leftover_plaintext"]
-        return course
 
-    all_courses = fetch_all_courses()
-
-    courses = dict()
-    for course in coursesCOL.find():
-        courses[course["code"]] = generate_course(course, False)
-
-    years = list(map(str, sorted(ARCHIVED_YEARS, reverse=True)))
-    for course_code in all_courses:
-        if course_code in courses:
-            continue
-        for year in years:
-            course = archivesDB[year].find_one({"code": course_code})
-            if course:
-                courses[course["code"]] = generate_course(course, True)
-                break
+    The dump is built once when the course catalogue loads and is streamed
+    back out as-is. Clients polling this should send back the `ETag` they
+    were given in `If-None-Match`.
+    """
+    dump = get_catalogue().dump
+    if accept is not None and "application/x-ndjson" in accept:
+        fmt = "ndjson"
+    # the representation can be picked by the `Accept` header, so caches must key on it
+    headers = {"ETag": dump.etags[fmt], "Vary": "Accept"}
+    if etag_matches(if_none_match, dump.etags[fmt]):
+        return Response(status_code=304, headers=headers)
 
-    return list(courses.values())
+    if fmt == "ndjson":
+        return StreamingResponse(dump.iter_ndjson(), media_type="application/x-ndjson", headers=headers)
+    return StreamingResponse(dump.iter_json(), media_type="application/json", headers=headers)
 
 @router.get(
     "/getCourse/{courseCode}",
     response_model=CourseDetails,
+    dependencies=[Depends(conditional_get)],
     responses={
         400: {
             "description": "The given course code could not be found in the database",
@@ -163,33 +151,74 @@ def get_courses() -> list[Dict]:
 def get_course(courseCode: str) -> Dict:
     """
     Get info about a course given its courseCode
-    - start with the current database
-    - if not found, check the archives
+    - start with the current year
+    - if not found, check the archives (newest first)
     """
-    result = coursesCOL.find_one({"code": courseCode})
-    if not result:
-        for year in sorted(ARCHIVED_YEARS, reverse=True):
-            result = archivesDB[str(year)].find_one({"code": courseCode})
-            if result is not None:
-                result.setdefault("raw_requirements", "")
-                result["is_legacy"] = True
-                break
-    else:
-        result["is_legacy"] = False
-
+    result = get_catalogue().get_course(courseCode)
     if not result:
         raise HTTPException(
             status_code=400, detail=f"Course code {courseCode} was not found"
         )
-    result.setdefault("school", None)
-    result['is_accurate'] = CONDITIONS.get(courseCode) is not None
-    result['handbook_note'] = CACHED_HANDBOOK_NOTE.get(courseCode, "")
-    del result["_id"]
-    with suppress(KeyError):
-        del result["exclusions"]["leftover_plaintext"]
     return result
 
 
+@router.post(
+    "/getCourses",
+    response_model=CoursesDetails,
+    responses={
+        200: {
+            "description": "Returns the details of every found course, and an error for each course that was not",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "courses": {
+                            "COMP1511": {"code": "COMP1511", "title": "Programming Fundamentals", "UOC": 6},
+                        },
+                        "errors": {
+                            "COMP1234": "Course code COMP1234 was not found",
+                        },
+                    }
+                }
+            },
+        },
+    },
+)
+def get_courses_details(request: CoursesRequest) -> Dict:
+    """
+    Like /getCourse/ (or /getLegacyCourse/ if a past year is given), but for
+    many courses at once
+    """
+    courses, errors = resolve_courses(request.courses, request.year or LIVE_YEAR)
+    return {"courses": courses, "errors": errors}
+
+def resolve_courses(codes: Iterable[str], year: str | int = LIVE_YEAR) -> Tuple[Dict[str, Dict], Dict[str, str]]:
+    """
+    Looks up every given course in a single pass over the catalogue.
+    Returns the details of each course found, as `get_course_info` would,
+    and an error message for each course that was not.
+    """
+    catalogue = get_catalogue()
+    is_live = int(year) == int(LIVE_YEAR)
+    courses: Dict[str, Dict] = {}
+    errors: Dict[str, str] = {}
+    for code in dict.fromkeys(codes):
+        course = catalogue.get_course(code) if is_live else catalogue.get_legacy_course(str(year), code)
+        if course is None:
+            errors[code] = f"Course code {code} was not found"
+            continue
+        if not is_live:
+            course["is_legacy"] = True
+        courses[code] = course
+    return courses, errors
+
+def resolve_courses_or_raise(codes: Iterable[str]) -> Dict[str, Dict]:
+    """ Like `resolve_courses`, but raises a 400 if any course can't be found """
+    courses, errors = resolve_courses(codes)
+    if errors:
+        raise HTTPException(status_code=400, detail=next(iter(errors.values())))
+    return courses
+
+
 @router.post(
     "/searchCourse/{search_string}",
     responses={
@@ -226,24 +255,15 @@ def search(userData: UserData, search_string: str) -> Dict[str, str]:
           "COMP1531": "SoftEng Fundamentals",
             ……. }
     """
-    from server.routers.programs import get_structure
-
-    all_courses = fetch_all_courses()
+    candidates = get_catalogue().search_index.candidates(search_string)
 
-    specialisations = list(userData.specialisations)
-    majors = list(filter(lambda x: x.endswith("1") or x.endswith("H"), specialisations))
-    minors = list(filter(lambda x: x.endswith("2"), specialisations))
-    structure = get_structure(userData.program, "+".join(specialisations))['structure']
+    weights = get_relevance_weights(userData.program, tuple(sorted(userData.specialisations)))
 
-    top_results = sorted(all_courses.items(), reverse=True,
-                         key=lambda course: fuzzy_match(course, search_string)
-                         )[:100]
+    top_results = heapq.nlargest(100, candidates,
+                                 key=lambda course: fuzzy_match(course, search_string)
+                                 )
     weighted_results = sorted(top_results, reverse=True,
-                              key=lambda course: weight_course(course,
-                                                               search_string,
-                                                               structure,
-                                                               majors,
-                                                               minors)
+                              key=lambda course: weight_course(course, search_string, weights)
                               )[:30]
 
     return dict(weighted_results)
@@ -254,16 +274,23 @@ def regex_search(search_string: str) -> Mapping[str, str]:
     """
 
     pat = re.compile(search_string, re.I)
-    courses = list(coursesCOL.find({"code": {"$regex": pat}}))
+    catalogue = get_catalogue()
+    courses = {
+        code: course["title"] for code, course in catalogue.courses.items()
+        if not course["is_legacy"] and pat.search(code)
+    }
 
     # TODO: do we want to always include matching legacy courses (excluding duplicates)?
     if not courses:
         for year in sorted(ARCHIVED_YEARS, reverse=True):
-            courses = list(archivesDB[str(year)].find({"code": {"$regex": pat}}))
+            courses = {
+                code: course["title"] for code, course in catalogue.get_legacy_year(str(year)).items()
+                if pat.search(code)
+            }
             if courses:
                 break
 
-    return {course["code"]: course["title"] for course in courses}
+    return courses
 
 
 @router.post(
@@ -288,7 +315,8 @@ def regex_search(search_string: str) -> Mapping[str, str]:
         },
     },
 )
-def get_all_unlocked(userData: UserData) -> Dict[str, Dict]:
+@compress()
+def get_all_unlocked(userData: UserData) -> Response:
     """
     Given the userData and a list of locked courses, returns the state of all
     the courses. Note that locked courses always return as True with no warnings
@@ -296,24 +324,24 @@ def get_all_unlocked(userData: UserData) -> Dict[str, Dict]:
     that they have already completed
     """
 
-    coursesState = {}
     user = User(fix_user_data(userData.dict()))
-    for course, condition in CONDITIONS.items():
-        result, warnings = condition.validate(user) if condition is not None else (True, [])
-        if result:
-            coursesState[course] = {
-                "is_accurate": condition is not None,
-                "unlocked": result,
-                "handbook_note": CACHED_HANDBOOK_NOTE.get(course, ""),
-                "warnings": warnings,
-            }
+    coursesState = {
+        course: {
+            "is_accurate": CONDITIONS[course] is not None,
+            "unlocked": True,
+            "handbook_note": CACHED_HANDBOOK_NOTE.get(course, ""),
+            "warnings": warnings,
+        }
+        for course, warnings in COMPILED_CONDITIONS.get().evaluator(user).unlocked()
+    }
 
-    return {"courses_state": coursesState}
+    return fast_json({"courses_state": coursesState})
 
 
 @router.get(
     "/getLegacyCourses/{year}/{term}",
     response_model=ProgramCourses,
+    dependencies=[Depends(loaded(CATALOGUE))],
     responses={
         400: {"description": "Year or Term input is incorrect"},
         200: {
@@ -342,11 +370,15 @@ def get_all_unlocked(userData: UserData) -> Dict[str, Dict]:
         },
     },
 )
-def get_legacy_courses(year, term) -> Dict[str, Dict[str, str]]:
+async def get_legacy_courses(year, term) -> Dict[str, Dict[str, str]]:
     """
     Gets all the courses that were offered in that term for that year
     """
-    result = {c['code']: c['title'] for c in archivesDB[year].find() if term in c['terms']}
+    result = {
+        code: course['title']
+        for code, course in get_catalogue().get_legacy_year(year).items()
+        if term in course['terms']
+    }
 
     if not result:
         raise HTTPException(status_code=400, detail="Invalid term or year. Valid terms: T0, T1, T2, T3. Valid years: 2019, 2020, 2021, 2022.")
@@ -360,10 +392,9 @@ def get_legacy_course(year: str, courseCode: str) -> Dict:
         Like /getCourse/ but for legacy courses in the given year.
         Returns information relating to the given course
     """
-    result = archivesDB[year].find_one({"code": courseCode})
+    result = get_catalogue().get_legacy_course(year, courseCode)
     if not result:
         raise HTTPException(status_code=400, detail="invalid course code or year")
-    del result["_id"]
     result["is_legacy"] = True
     return result
 
@@ -395,10 +426,12 @@ def unselect_course(userData: UserData, unselectedCourse: str) -> dict[str, list
     if not user.has_taken_course(unselectedCourse):
         return { 'courses' : [] }
 
-    affected_courses = []
-    # Brute force loop through all taken courses and if we find a course which is
-    # no longer unlocked, we unselect it, add it to the affected course list,
-    # then restart loop.
+    affected_courses: list[str] = []
+    # Unselect every course which is no longer unlocked, round by round, until
+    # nothing else is affected. The first round checks every taken course (so
+    # that courses which were already locked get removed too); after that, only
+    # the dependents of the courses removed in the previous round can change.
+    courses_to_check = set(user.get_courses())
     courses_to_delete = [unselectedCourse]
     while courses_to_delete:
         affected_courses.extend(courses_to_delete)
@@ -406,12 +439,16 @@ def unselect_course(userData: UserData, unselectedCourse: str) -> dict[str, list
             if user.has_taken_course(course):
                 user.pop_course(course)
 
+        evaluator = COMPILED_CONDITIONS.get().evaluator(user)
         courses_to_delete = [
             c
             for c in user.get_courses()
-            if CONDITIONS.get(c) is not None  # course is in conditions
-            and not (CONDITIONS[c].validate(user))[0]  # not unlocked anymore
+            if c in courses_to_check
+            and c not in affected_courses
+            and CONDITIONS.get(c) is not None  # course is in conditions
+            and not evaluator.is_unlocked(c)  # not unlocked anymore
         ]
+        courses_to_check = set().union(*map(COMPILED_CONDITIONS.get().affected_by, courses_to_delete))
 
     return { 'courses' : list(sorted(affected_courses)) }
 
@@ -431,13 +468,52 @@ def course_children(course: str):
         raise HTTPException(400, f"no course by name {course}")
     return {
             "original" : course,
-            "courses": [
-                coursename for coursename, condition in CONDITIONS.items()
-                if condition is not None and condition.is_path_to(course)
-            ]
+            "courses": list(GRAPH.get()["outgoing_adjacency_list"].get(course, [])),
         }
 
-@router.get("/getPathFrom/{course}", response_model=CoursesPath,
+REACHABILITY = dataset("reachability", lambda: ReachabilityIndex.from_json(read_data(REACHABILITY_CACHE_FILE)))
+
+@router.get("/descendants/{course}", response_model=CoursesPath, dependencies=[Depends(conditional_get), Depends(loaded(REACHABILITY))],
+            responses = {
+                200 : {
+                    "original": "COMP1511",
+                    "courses": ["COMP1521", "COMP1531", "COMP2521", "COMP3900"]
+                }
+            })
+async def get_descendants(course: str, depth: Optional[int] = Query(default=None, ge=0)) -> CoursesPathDict:
+    """
+    fetches every course which 'course' is eventually a prerequisite of,
+    optionally only those at most 'depth' steps away
+    eg 1511 -> 1521, 1531, 2521, 3900 etc
+    """
+    if course not in CONDITIONS:
+        raise HTTPException(400, f"no course by name {course}")
+    return {
+        "original": course,
+        "courses": REACHABILITY.get().descendants(course, depth),
+    }
+
+@router.get("/ancestors/{course}", response_model=CoursesPath, dependencies=[Depends(conditional_get), Depends(loaded(REACHABILITY))],
+            responses = {
+                200 : {
+                    "original": "COMP3900",
+                    "courses": ["COMP1511", "COMP1521", "COMP1531", "COMP2521"]
+                }
+            })
+async def get_ancestors(course: str, depth: Optional[int] = Query(default=None, ge=0)) -> CoursesPathDict:
+    """
+    fetches every course which is eventually a prerequisite of 'course',
+    optionally only those at most 'depth' steps away
+    eg 3900 -> 1511, 1521, 1531, 2521 etc
+    """
+    if course not in CONDITIONS:
+        raise HTTPException(400, f"no course by name {course}")
+    return {
+        "original": course,
+        "courses": REACHABILITY.get().ancestors(course, depth),
+    }
+
+@router.get("/getPathFrom/{course}", response_model=CoursesPath, dependencies=[Depends(conditional_get)],
             responses = {
                 200 : {
                     "courses": ["COMP1521", "COMP1531"]
@@ -448,7 +524,7 @@ def get_path_from(course: str) -> CoursesPathDict:
     fetches courses which can be used to satisfy 'course'
     eg 2521 -> 1511
     """
-    out: List[str] = list(INCOMING_ADJACENCY.get(course, []))
+    out: List[str] = list(GRAPH.get()["incoming_adjacency_list"].get(course, []))
     return {
         "original" : course,
         "courses" : out,
@@ -472,12 +548,17 @@ def get_path_from(course: str) -> CoursesPathDict:
             })
 def courses_unlocked_when_taken(userData: UserData, courseToBeTaken: str) -> Dict[str, List[str]]:
     """ Returns all courses which are unlocked when given course is taken """
+    # only the courses which depend on the new course can change state
+    affected = COMPILED_CONDITIONS.get().affected_by(courseToBeTaken)
+    user = User(fix_user_data(userData.dict()))
     ## initial state
-    courses_initially_unlocked = unlocked_set(get_all_unlocked(userData)['courses_state'])
+    before = COMPILED_CONDITIONS.get().evaluator(user)
+    courses_initially_unlocked = {course for course in affected if before.is_unlocked(course)}
     ## add course to the user
-    userData.courses[courseToBeTaken] = [get_course(courseToBeTaken)['UOC'], None]
+    user.add_courses({courseToBeTaken: (get_course(courseToBeTaken)['UOC'], None)})
     ## final state
-    courses_now_unlocked = unlocked_set(get_all_unlocked(userData)['courses_state'])
+    after = COMPILED_CONDITIONS.get().evaluator(user)
+    courses_now_unlocked = {course for course in affected if after.is_unlocked(course)}
     new_courses = courses_now_unlocked - courses_initially_unlocked
 
     ## Differentiate direct and indirect unlocks
@@ -556,10 +637,6 @@ def terms_offered(course: str, years:str) -> TermsOffered:
 ###############################################################################
 
 
-def unlocked_set(courses_state) -> Set[str]:
-    """ Fetch the set of unlocked courses from the courses_state of a getAllUnlocked call """
-    return set(course for course in courses_state if courses_state[course]['unlocked'])
-
 def is_course_unlocked(course: str, user: User) -> Tuple[bool, List[str]]:
     """
     Returns if the course is unlocked for the given user.
@@ -572,8 +649,7 @@ def is_course_unlocked(course: str, user: User) -> Tuple[bool, List[str]]:
 
     # TODO: remove this as blank once program_restrictions return warnings
     program_warnings: List[str] = []
-    program_restriction = get_program_restriction(user.program) or NoRestriction()
-    program_result = program_restriction.validate_course_allowed(user, course)
+    program_result = PROGRAM_RESTRICTIONS.validate_course_allowed(user, course)
 
     return (course_result and program_result), (course_warnings + program_warnings),
 
@@ -591,50 +667,55 @@ def fuzzy_match(course: Tuple[str, str], search_term: str) -> float:
                sum(fuzz.partial_ratio(title.lower(), word)
                        for word in search_term.split(' ')))
 
-def weight_course(
-        course: tuple[str, str], search_term: str, structure: dict,
-                  majors: list, minors: list) -> float:
+class RelevanceWeights(NamedTuple):
+    """ The search bonuses given to courses for a given program and its specialisations """
+    # course code -> bonus for being in the structure of a major/minor
+    courses: Dict[str, int]
+    # 4 letter course prefix -> bonus for sharing a prefix with a major/minor
+    prefixes: Dict[str, int]
+
+def weight_course(course: tuple[str, str], search_term: str, weights: RelevanceWeights) -> float:
     """ Gives the course a weighting based on the relevance to the user's degree """
-    weight = fuzzy_match(course, search_term)
     code, _ = course
+    return (
+        fuzzy_match(course, search_term)
+        + weights.courses.get(code, 0)
+        + weights.prefixes.get(code[:4], 0)
+    )
 
-    for structKey in structure.keys():
-        if "Major" not in structKey:
-            continue
-        for key in structure[structKey].items():
-            if isinstance(key[1], dict):
-                for c in key[1].get("courses", {}):
-                    if code in c:
-                        if re.match("core|prescribed", key[0], flags=re.IGNORECASE):
-                            weight += 40
-                        else:
-                            weight += 20
-                        break
-
-    for major_code in majors:
-        if str(code).startswith(major_code[:4]):
-            weight += 14
-            break
-
-    for structKey in structure.keys():
-        if "Minor" not in structKey:
-            continue
-        for key in structure[structKey].items():
-            if isinstance(key[1], dict):
-                for c in key[1].get("courses", {}):
-                    if code in c:
-                        if re.match("core|prescribed", key[0], flags=re.IGNORECASE):
-                            weight += 20
-                        else:
-                            weight += 10
-                        break
-
-    for minor_code in minors:
-        if str(code).startswith(minor_code[:4]):
-            weight += 7
-            break
-
-    return weight
+# (core / prescribed group, any other group) weights for courses in a major / minor
+STRUCTURE_WEIGHTS: Dict[str, Tuple[int, int]] = {"Major": (40, 20), "Minor": (20, 10)}
+# weights given to courses sharing a prefix with a major / minor
+PREFIX_WEIGHTS: Dict[str, int] = {"Major": 14, "Minor": 7}
+
+@functools.lru_cache(maxsize=256)
+def get_relevance_weights(program: str, specialisations: Tuple[str, ...]) -> RelevanceWeights:
+    """
+    Builds the search relevance bonuses for a program and (sorted) tuple of
+    specialisations. These only depend on the degree structure, so they are
+    shared between everyone in the same degree.
+    """
+    from server.routers.programs import get_structure
+
+    structure = get_structure(program, "+".join(specialisations))['structure']
+    courses: Dict[str, int] = {}
+    for struct_key, container in structure.items():
+        for kind, (core_weight, other_weight) in STRUCTURE_WEIGHTS.items():
+            if kind not in struct_key:
+                continue
+            for group_title, group in container["content"].items():
+                weight = core_weight if re.match("core|prescribed", group_title, flags=re.IGNORECASE) else other_weight
+                for code in set(group.get("courses", {})):
+                    courses[code] = courses.get(code, 0) + weight
+
+    prefixes: Dict[str, int] = {}
+    majors = [spec for spec in specialisations if spec.endswith("1") or spec.endswith("H")]
+    minors = [spec for spec in specialisations if spec.endswith("2")]
+    for kind, specs in (("Major", majors), ("Minor", minors)):
+        for prefix in {spec[:4] for spec in specs}:
+            prefixes[prefix] = prefixes.get(prefix, 0) + PREFIX_WEIGHTS[kind]
+
+    return RelevanceWeights(courses, prefixes)
 
 def get_course_info(course: str, year: str | int = LIVE_YEAR) -> Dict:
     """
@@ -655,14 +736,6 @@ def get_term_offered(course: str, year: int | str=LIVE_YEAR) -> list[str]:
 def get_program_restriction(program_code: Optional[str]) -> Optional[ProgramRestriction]:
     """
     Returns the program restriction for the given program code.
-    Also responsible for starting up `PROGRAM_RESTRICTIONS` the first time it is called.
-    !Untested
-    """
-    # TODO: This loading should not be here; very slow
-    # making it global causes some errors
-    # There needs to be a startup event for routers to load data
-    if not program_code:
-        return None
-    with open(PROGRAM_RESTRICTIONS_PICKLE_FILE, "rb") as file:
-        program_restrictions: dict[str, ProgramRestriction] = pickle.load(file)
-    return program_restrictions.get(program_code, None)
+    The restrictions are loaded once and shared, see `server.program_restrictions`.
+    """
+    return PROGRAM_RESTRICTIONS.get(program_code)
@@ -1,26 +1,41 @@
-import json
+from types import MappingProxyType
+from typing import Mapping
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 
-from server.database import coursesCOL
+from data.config import FOLLOWUPS_CACHE_FILE
+from data.utility.data_helpers import read_data
+from server.catalogue import CATALOGUE, get_catalogue
+from server.datasets import dataset, loaded
 
 router = APIRouter(
     prefix="/followups",
     tags=["followups"],
 )
 
-def get_next_term(term: str) -> str:
+TERMS = ['T0', 'T1', 'T2', 'T3']
 
-    terms = ['S', 'T1', 'T2', 'T3']
-    try:
-        return terms[(terms.index(term) + 1) % 4]
-    except:
-        return "invalid_term"
 
+# origin course -> origin term -> followup course -> { next term: number of students }
+FollowupsT = Mapping[str, Mapping[str, dict[str, dict[str, int]]]]
+
+def load_followups() -> FollowupsT:
+    """
+    Reads the followups table precomputed by `data.processors.enrolment_processing`,
+    already in the shape `getFollowups` returns and ordered most popular first
+    """
+    return MappingProxyType({
+        course: MappingProxyType({
+            term: dict(followups) for term, followups in terms.items()
+        })
+        for course, terms in read_data(FOLLOWUPS_CACHE_FILE).items()
+    })
+
+FOLLOWUPS = dataset("followups", load_followups)
 
-EnrolmentDataT = dict[str, dict[str, list[str]]]
 @router.get(
     "/getFollowups/{origin_course}/{origin_term}",
+    dependencies=[Depends(loaded(CATALOGUE, FOLLOWUPS))],
     responses={
         200: {
             "description": "Returns a list of the most popular followup courses",
@@ -49,61 +64,19 @@ EnrolmentDataT = dict[str, dict[str, list[str]]]
         }
     }
 )
-def get_followups(origin_course: str, origin_term: str) -> dict[str, str | dict[str, dict[str, int]]]:
-    # origin_term is the term that the original course was/would be taken in
-
-    next_term = get_next_term(origin_term)
-
-    if (next_term == 'invalid_term'):
+async def get_followups(origin_course: str, origin_term: str) -> dict[str, str | dict[str, dict[str, int]]]:
+    # origin_term is the term that the original course was/would be taken in.
+    # Followups are counted in the term after it; for T3, that is both the next
+    # year's summer term and T1
+    if origin_term not in TERMS:
         raise HTTPException(400, f"Invalid term {origin_term}")
 
-    # we only have enrolment data from T2(2022) -> T3(2022) at this stage
-    if (origin_term != 'T2'):
-        raise HTTPException(400, "Data only available from T2")
-
-    # get all comp courses
-    all_comp_courses = filter(lambda course: course.startswith("COMP"),
-                              [course["code"] for course in coursesCOL.find()])
-
-    if (origin_course not in all_comp_courses):
+    course = get_catalogue().courses.get(origin_course)
+    if not origin_course.startswith("COMP") or course is None or course["is_legacy"]:
         raise HTTPException(400, f"Invalid COMP course {origin_course}")
 
-    # get enrolment data
-    # TODO: Add Enrolment Data back
-    with open("./data/final_data/enrolmentData.json", "r", encoding="utf8") as enrolment_data_file:
-        enrolment_data: EnrolmentDataT = json.load(enrolment_data_file)
-
-    origin_course_members = enrolment_data.get(origin_course, {}).get(origin_term, [])
-    # origin_course_members = enrolment_data[origin_course][origin_term]
-
-    # calculate followups
-    followups = {}
-    for course in all_comp_courses:
-        # count duplicates between:
-        #  people who took the origin_course in origin_term
-        #  people who took this course in the following term.
-        # TODO: this is NOT how next term works!
-        # Need to wrap around to next year and whatnot, need better tracking
-        # Also, maybe add an inverted index?
-        num_followups = len(set(
-            get_set_enrolled_in_term(enrolment_data, course, next_term) & set(origin_course_members)
-        ))
-
-        if num_followups != 0:
-            followups.update({ course: { next_term: num_followups } })
-
-    top_followups = sorted(followups.items(), reverse=True, key=lambda course: course[1][next_term])
-
     return {
         "originCourse": origin_course,
         "originTerm": origin_term,
-        "followups": dict(top_followups),
+        "followups": dict(FOLLOWUPS.get().get(origin_course, {}).get(origin_term, {})),
     }
-
-def get_set_enrolled_in_term(
-    enrolment_data: EnrolmentDataT,
-    course: str,
-    term: str
-) -> set[str]:
-    return set(enrolment_data.get(course, {}).get(term, []))
-
@@ -6,8 +6,10 @@ from typing import Literal, Optional, TypedDict
 
 from pydantic import BaseModel
 
+from algorithms.compiled_conditions import CompiledConditions
 from algorithms.objects.conditions import CompositeCondition
 from algorithms.objects.user import User
+from server.datasets import dataset
 
 class Programs(BaseModel):
     programs: dict
@@ -180,6 +182,15 @@ class PlannerData(BaseModel):
 class CourseCodes(BaseModel):
     courses: list[str]
 
+class CoursesRequest(BaseModel):
+    courses: list[str]
+    year: Optional[int] = None
+
+class CoursesDetails(BaseModel):
+    # live courses are shaped like `CourseDetails`, legacy courses are as archived
+    courses: dict[str, dict]
+    errors: dict[str, str]
+
 class Courses(BaseModel):
     courses: dict[str, str] = {}
 
@@ -202,6 +213,11 @@ class Graph(BaseModel):
     edges: list[dict[str, str]]
     courses: list[str]
 
+class CompactGraph(BaseModel):
+    # [source, target] indexes into `courses`
+    edges: list[tuple[int, int]]
+    courses: list[str]
+
 class TermsList(BaseModel):
     terms: Optional[dict[str, Optional[list[str]]]]
     # Actually tuple(str, fastapi.exceptions.HTTPException)
@@ -220,5 +236,7 @@ CONDITIONS_PATH = "data/final_data/conditions.pkl"
 with open(CONDITIONS_PATH, "rb") as file:
     CONDITIONS: dict[str, CompositeCondition] = pickle.load(file)
 
+COMPILED_CONDITIONS = dataset("compiled_conditions", lambda: CompiledConditions(CONDITIONS))
+
 with open("algorithms/cache/handbook_note.json", "r", encoding="utf8") as handbook_file:
     CACHED_HANDBOOK_NOTE: dict[str, str] = json.load(handbook_file)
@@ -2,25 +2,31 @@
 route for planner algorithms
 """
 from typing import Optional, Tuple
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from algorithms.validate_term_planner import validate_terms
 from algorithms.autoplanning import autoplan
 from algorithms.objects.user import User
 from server.routers.model import (ValidCoursesState, PlannerData,
                                 ValidPlannerData, ProgramTime)
-from server.routers.courses import get_course
+from server.routers.courses import resolve_courses_or_raise
 from server.routers.utility import get_course_object
+from server.responses import compress, fast_json
 
 def fix_planner_data(plannerData: PlannerData) -> ValidPlannerData:
     """ fixes the planner data to add missing UOC info """
     plan: list[list[dict[str, Tuple[int, Optional[int]]]]] = []
+    details = resolve_courses_or_raise(
+        courseName
+        for year in plannerData.plan for term in year
+        for courseName, course in term.items() if not isinstance(course, list)
+    )
     for year_index, year in enumerate(plannerData.plan):
         plan.append([])
         for term_index, term in enumerate(year):
             plan[year_index].append({})
             for courseName, course in term.items():
                 if not isinstance(course, list):
-                    plan[year_index][term_index][courseName] = (get_course(courseName)["UOC"], course)
+                    plan[year_index][term_index][courseName] = (details[courseName]["UOC"], course)
                 elif course[0] is not None:
                     plan[year_index][term_index][courseName] = (course[0], course[1])
     return ValidPlannerData(
@@ -41,7 +47,8 @@ def planner_index() -> str:
     return "Index of planner"
 
 @router.post("/validateTermPlanner/", response_model=ValidCoursesState)
-def validate_term_planner(plannerData: PlannerData):
+@compress()
+def validate_term_planner(plannerData: PlannerData) -> Response:
     """
     Will iteratively go through the term planner data whilst
     iteratively filling the user with courses.
@@ -54,7 +61,7 @@ def validate_term_planner(plannerData: PlannerData):
     data = fix_planner_data(plannerData)
     coursesState = validate_terms(data)
 
-    return {"courses_state": coursesState}
+    return fast_json({"courses_state": coursesState})
 
 @router.post("/autoplanning/",
     response_model=dict,
@@ -1,32 +1,38 @@
 """
 API for fetching data about programs and specialisations """
 from contextlib import suppress
+import copy
 import functools
+import itertools
 import re
-from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, cast
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Literal, Mapping, NamedTuple, Optional, Tuple
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 
 from data.processors.models import (
     CourseContainer,
-    Program,
     ProgramContainer,
     Specialisation,
 )
 from data.utility import data_helpers
-from server.database import programsCOL, specialisationsCOL
+from server.conditional_get import conditional_get
+from server.datasets import dataset, loaded
+from server.handbook import PROGRAMS, SPECIALISATIONS
 from server.manual_fixes import apply_manual_fixes
-from server.routers.courses import get_path_from, regex_search
+from server.responses import compress, fast_json
+from server.sized_cache import SizedLRUCache
+from server.routers.courses import GRAPH, regex_search
 from server.routers.model import (
     CourseCodes,
     Courses,
+    CompactGraph,
     Graph,
     Programs,
     Structure,
     StructureContainer,
-    CoursesPathDict,
 )
-from server.routers.utility import get_core_courses, map_suppressed_errors
+from server.routers.utility import get_core_courses
 
 
 router = APIRouter(
@@ -34,6 +40,10 @@ router = APIRouter(
     tags=["programs"],
 )
 
+# the memory the built structures of `/getStructure` may use
+STRUCTURE_CACHE_BYTES = 64 * 2 ** 20
+STRUCTURES: SizedLRUCache[dict] = SizedLRUCache(STRUCTURE_CACHE_BYTES)
+
 
 @router.get("/")
 def programs_index() -> str:
@@ -42,16 +52,16 @@ def programs_index() -> str:
 
 
 # TODO: response model to this somehow
-@router.get("/getAllPrograms")
-def get_all_programs() -> Dict[Any, Any]:
+@router.get("/getAllPrograms", dependencies=[Depends(loaded(PROGRAMS))])
+async def get_all_programs() -> Dict[Any, Any]:
     """
     Like `/getPrograms` but does not filter any programs for if they are
     production ready.
     """
     return {
         "programs": {
-            q["code"]: q["title"]
-            for q in programsCOL.find()
+            code: program["title"]
+            for code, program in PROGRAMS.get().items()
         }
     }
 
@@ -76,9 +86,9 @@ def get_all_programs() -> Dict[Any, Any]:
         }
     },
 )
-def get_programs() -> dict[str, dict[str, str]]:
+async def get_programs() -> dict[str, dict[str, str]]:
     """ Fetch all the programs the backend knows about in the format of { code: title } """
-    # return {"programs": {q["code"]: q["title"] for q in programsCOL.find()}}
+    # return {"programs": {code: program["title"] for code, program in PROGRAMS.get().items()}}
     # TODO On deployment, DELETE RETURN BELOW and replace with the return above
     return {
         "programs": {
@@ -135,18 +145,15 @@ def add_geneds_courses(programCode: str, structure: dict[str, StructureContainer
     item = structure["General"]["content"]["General Education"]
     item["courses"] = {}
     if container.get("courses") is None:
-        gen_ed_courses = list(set(get_gen_eds(programCode)["courses"].keys()) - set(sum(
-            (
-                sum((
-                    list(value["courses"].keys())
-                    for sub_group, value in spec["content"].items()
-                    if 'core' in sub_group.lower()
-                ), [])
+        cores = set(itertools.chain.from_iterable(
+            value["courses"].keys()
             for spec_name, spec in structure.items()
-            if "Major" in spec_name or "Honours" in spec_name)
-        , [])))
-        geneds = get_gen_eds(programCode)
-        item["courses"] = {course: geneds["courses"][course] for course in gen_ed_courses}
+            if "Major" in spec_name or "Honours" in spec_name
+            for sub_group, value in spec["content"].items()
+            if 'core' in sub_group.lower()
+        ))
+        # a fresh dict, since manual fixes may remove courses from the structure
+        item["courses"] = dict(get_gen_eds(programCode, cores)["courses"])
 
 
     return list(item["courses"].keys())
@@ -154,19 +161,40 @@ def add_geneds_courses(programCode: str, structure: dict[str, StructureContainer
 
 def add_specialisation(structure: dict[str, StructureContainer], code: str) -> None:
     """ Add a specialisation to the structure of a getStructure call """
-    # in a specialisation, the first container takes priority - no duplicates may exist
-    if code.endswith("1"):
-        type = "Major"
-    elif code.endswith("2"):
-        type = "Minor"
-    else:
-        type = "Honours"
-
-    spnResult = cast(Optional[Specialisation], specialisationsCOL.find_one({"code": code}))
-    type = f"{type} - {code}"
-    if not spnResult:
+    blocks = SPECIALISATION_BLOCKS.get()
+    if code not in blocks:
         raise HTTPException(
-            status_code=400, detail=f"{code} of type {type} not found")
+            status_code=400, detail=f"{code} of type {specialisation_type(code)} - {code} not found")
+    type, block = blocks[code]
+    # the blocks are shared, and manual fixes edit the structure in place
+    structure[type] = copy.deepcopy(block)
+
+def specialisation_type(code: str) -> str:
+    if code.endswith("1"):
+        return "Major"
+    if code.endswith("2"):
+        return "Minor"
+    return "Honours"
+
+def build_specialisation_blocks() -> dict[str, Tuple[str, StructureContainer]]:
+    """
+    Builds the structure of every specialisation on its own, as
+    `add_specialisation` adds it to a structure.
+    Maps the code to the type (the structure key) and the structure container.
+    """
+    blocks: dict[str, Tuple[str, StructureContainer]] = {}
+    for code, spnResult in SPECIALISATIONS.get().items():
+        structure: dict[str, StructureContainer] = {}
+        type = f"{specialisation_type(code)} - {code}"
+        build_specialisation(structure, type, spnResult)
+        blocks[code] = (type, structure[type])
+    return blocks
+
+SPECIALISATION_BLOCKS = dataset("specialisation_blocks", build_specialisation_blocks)
+
+def build_specialisation(structure: dict[str, StructureContainer], type: str, spnResult: Specialisation) -> None:
+    """ Adds a specialisation's containers to the structure under `type` """
+    # in a specialisation, the first container takes priority - no duplicates may exist
     structure[type] = {"name": spnResult["name"], "content": {}}
     # NOTE: takes Core Courses are first
     exceptions: list[str] = []
@@ -181,6 +209,7 @@ def add_specialisation(structure: dict[str, StructureContainer], code: str) -> N
 @router.get(
     "/getStructure/{programCode}/{spec}",
     response_model=Structure,
+    dependencies=[Depends(conditional_get)],
     responses={
         400: { "description": "Uh oh you broke me" },
         200: {
@@ -258,11 +287,21 @@ def add_specialisation(structure: dict[str, StructureContainer], code: str) -> N
         }
     }
 )
-@router.get("/getStructure/{programCode}", response_model=Structure)
+@router.get("/getStructure/{programCode}", response_model=Structure, dependencies=[Depends(conditional_get)])
 def get_structure(
     programCode: str, spec: Optional[str] = None, ignore: Optional[str] = None
 ):
-    """ get the structure of a course given specs and program code """
+    """
+    get the structure of a course given specs and program code
+    NOTE: the result is shared with every other request - do not mutate it
+    """
+    return STRUCTURES.get(
+        (programCode, spec, ignore),
+        lambda: build_structure(programCode, spec, ignore),
+    )
+
+def build_structure(programCode: str, spec: Optional[str] = None, ignore: Optional[str] = None) -> dict:
+    """ Builds the structure for `get_structure` """
     # TODO: This ugly, use compose instead
 
     ignored = ignore.split("+") if ignore else []
@@ -303,6 +342,7 @@ def get_structure_course_list(
 @router.get(
     "/getGenEds/{programCode}",
     response_model=Courses,
+    dependencies=[Depends(conditional_get)],
     responses={
         400: {
             "description": "The given program code could not be found in the database",
@@ -325,39 +365,84 @@ def get_structure_course_list(
         },
     },
 )
-def get_gen_eds_route(programCode: str) -> Dict[str, Dict[str, str]]:
+@compress()
+def get_gen_eds_route(response: Response, programCode: str) -> Response:
     """ Fetches the geneds for a given program code """
+    return fast_json(get_structure_gen_eds(programCode), headers=response.headers)
+
+@functools.lru_cache(maxsize=256)
+def get_structure_gen_eds(programCode: str) -> Dict[str, Mapping[str, str]]:
+    """
+    The geneds of a program, less every course in the program's structure.
+    Worked out once per program; the result is read-only.
+    """
     course_list: List[str] = course_list_from_structure(get_structure(programCode, ignore="gened"))
-    return get_gen_eds(programCode, course_list)
+    return {"courses": MappingProxyType(get_gen_eds(programCode, course_list)["courses"])}
+
+def load_gen_eds() -> Mapping[str, Mapping[str, str]]:
+    """ Reads the geneds of every program, as read-only mappings """
+    return MappingProxyType({
+        program: MappingProxyType(geneds)
+        for program, geneds in data_helpers.read_data("data/scrapers/genedPureRaw.json").items()
+    })
+
+GENEDS = dataset("geneds", load_gen_eds)
 
 def get_gen_eds(
-        programCode: str, excluded_courses: Optional[List[str]] = None
-    ) -> Dict[str, Dict[str, str]]:
+        programCode: str, excluded_courses: Optional[Iterable[str]] = None
+    ) -> Dict[str, Mapping[str, str]]:
     """
-    fetches gen eds from file and removes excluded courses.
+    fetches gen eds and removes excluded courses.
         - `programCode` is the program code to fetch geneds for
-        - `excluded_courses` is a list of courses to exclude from the gened list.
+        - `excluded_courses` are the courses to exclude from the gened list.
         Typically the result of a `courseList` from `getStructure` to prevent
         duplicate courses between cores, electives and geneds.
+    NOTE: the result is read-only
     """
-    excluded_courses = excluded_courses if excluded_courses is not None else []
     try:
-        geneds: Dict[str, str] = data_helpers.read_data("data/scrapers/genedPureRaw.json")[programCode]
+        geneds = GENEDS.get()[programCode]
     except KeyError:
         raise HTTPException(status_code=400, detail=f"No geneds for progrm code {programCode}")
 
-    for course in excluded_courses:
-        if course in geneds:
-            del geneds[course]
-
-    return {"courses": geneds}
-
+    if not excluded_courses:
+        return {"courses": geneds}
+    excluded = set(excluded_courses)
+    return {"courses": {course: title for course, title in geneds.items() if course not in excluded}}
+
+
+GRAPH_RESPONSES: Dict[int | str, Dict[str, Any]] = {
+    200: {
+        "description": "Returns the prerequisite graph of the program's courses",
+        "content": {
+            "application/json": {
+                "examples": {
+                    "edges": {
+                        "summary": "format=edges (default)",
+                        "value": {
+                            "edges": [{"source": "COMP1511", "target": "COMP1521"}],
+                            "courses": ["COMP1511", "COMP1521"],
+                        },
+                    },
+                    "compact": {
+                        "summary": "format=compact",
+                        "value": {
+                            "edges": [[0, 1]],
+                            "courses": ["COMP1511", "COMP1521"],
+                        },
+                    },
+                },
+            },
+        },
+    },
+}
 
-@router.get("/graph/{programCode}/{spec}", response_model=Graph)
-@router.get("/graph/{programCode}", response_model=Graph)
+@router.get("/graph/{programCode}/{spec}", response_model=Graph | CompactGraph, dependencies=[Depends(conditional_get)], responses=GRAPH_RESPONSES)
+@router.get("/graph/{programCode}", response_model=Graph | CompactGraph, dependencies=[Depends(conditional_get)], responses=GRAPH_RESPONSES)
+@compress()
 def graph(
-        programCode: str, spec: Optional[str]=None
-    ):
+        response: Response, programCode: str, spec: Optional[str]=None,
+        fmt: Literal["edges", "compact"] = Query(default="edges", alias="format"),
+    ) -> Response:
     """
     Constructs a structure for the frontend to use for the graphical
     selector.
@@ -372,26 +457,27 @@ def graph(
                 }
             ]
         },
+    With `format=compact`, "courses" has each course once, and each edge is
+    instead a [source, target] pair of indexes into "courses".
     No longer returns 'err_edges: failed_courses' as those are suppressed and
     caught by the processor
     """
-    courses = get_structure_course_list(programCode, spec)["courses"]
-    edges = []
-    failed_courses: list[tuple] = []
-
-    proto_edges: list[Optional[CoursesPathDict]] = [map_suppressed_errors(
-        get_path_from, failed_courses, course
-    ) for course in courses]
-
-    edges = prune_edges(
-            proto_edges_to_edges(proto_edges),
-            courses
-        )
-
-    return {
-        "edges": edges,
-        "courses": courses,
-    }
+    program_graph = PROGRAM_GRAPHS.get(
+        (programCode, spec),
+        lambda: build_program_graph(programCode, spec),
+    )
+
+    # the conditional GET headers have to be carried over by hand, since
+    # FastAPI drops them when a route returns its own response
+    if fmt == "compact":
+        return fast_json({
+            "edges": program_graph.edge_index,
+            "courses": program_graph.nodes,
+        }, headers=response.headers)
+    return fast_json({
+        "edges": program_graph.edges,
+        "courses": program_graph.courses,
+    }, headers=response.headers)
 
 @router.get("/getCores/{programCode}/{spec}")
 def get_cores(programCode: str, spec: str):
@@ -444,7 +530,7 @@ def add_program_code_details(structure: dict[str, StructureContainer], programCo
         - structure
         - uoc (int) associated with the program code.
     """
-    programsResult = cast(Optional[Program], programsCOL.find_one({"code": programCode}))
+    programsResult = PROGRAMS.get().get(programCode)
     if not programsResult:
         raise HTTPException(
             status_code=400, detail="Program code was not found")
@@ -459,7 +545,7 @@ def add_geneds_to_structure(structure: dict[str, StructureContainer], programCod
         Insert geneds of the given programCode into the structure
         provided
     """
-    programsResult = cast(Optional[Program], programsCOL.find_one({"code": programCode}))
+    programsResult = PROGRAMS.get().get(programCode)
     if programsResult is None:
         raise HTTPException(
             status_code=400, detail="Program code was not found")
@@ -479,35 +565,41 @@ def compose(*functions: Callable) -> Callable:
     """
     return functools.reduce(lambda f, g: lambda *args, **kwargs: f(g(*args, **kwargs)), functions)
 
-def proto_edges_to_edges(proto_edges: list[Optional[CoursesPathDict]]) -> List[Dict[str, str]]:
-    """
-    Take the proto-edges created by calls to `path_from` and convert them into
-    a full list of edges of form.
-    [
-        {
-            "source": (str) - course_code, # This is the 'original' value
-            "target": (str) - course_code, # This is the value of 'courses'
-        }
-    ]
-    Effectively, turning an adjacency list into a flat list of edges
-    """
-    edges: List = []
-    for proto_edge in proto_edges:
-        # Incoming: { original: str,  courses: List[str]}
-        # Outcome:  { "src": str, "target": str }
-        if not proto_edge or not proto_edge["courses"]:
-            continue
-        for course in proto_edge["courses"]:
-            edges.append({
-                    "source": course,
-                    "target": proto_edge["original"],
-                }
-            )
-    return edges
-
-def prune_edges(edges: List[Dict[str, str]], courses: List[str]) -> List[Dict[str, str]]:
-    """
-    Remove edges between vertices that are not in the list of courses provided.
-    """
-    return [edge for edge in edges if edge["source"] in courses and edge["target"] in courses]
+class ProgramGraph(NamedTuple):
+    """ The prerequisite graph induced by the courses of a program's structure """
+    # the structure's courses, in structure order (with any repeats)
+    courses: List[str]
+    # u -> v => u in v's prereqs or coreqs, with u and v both in `courses`
+    edges: List[Dict[str, str]]
+    # each course once, and the edges as [source, target] indexes into it
+    nodes: List[str]
+    edge_index: List[Tuple[int, int]]
+
+# the memory the built graphs of `/graph` may use
+PROGRAM_GRAPH_CACHE_BYTES = 32 * 2 ** 20
+PROGRAM_GRAPHS: SizedLRUCache[ProgramGraph] = SizedLRUCache(PROGRAM_GRAPH_CACHE_BYTES)
+
+def build_program_graph(programCode: str, spec: Optional[str]) -> ProgramGraph:
+    """ Builds the prerequisite graph over the courses of the program's structure """
+    courses: List[str] = get_structure_course_list(programCode, spec)["courses"]
+    incoming = GRAPH.get()["incoming_adjacency_list"]
+    nodes = list(dict.fromkeys(courses))
+    ids = {course: index for index, course in enumerate(nodes)}
+
+    return ProgramGraph(
+        courses=courses,
+        edges=[
+            {"source": source, "target": target}
+            for target in courses
+            for source in incoming.get(target, [])
+            if source in ids
+        ],
+        nodes=nodes,
+        edge_index=[
+            (ids[source], target_id)
+            for target_id, target in enumerate(nodes)
+            for source in incoming.get(target, [])
+            if source in ids
+        ],
+    )
 
@@ -1,9 +1,11 @@
 """ Specialisations Route """
-from typing import Literal, Optional, cast
-from fastapi import APIRouter, HTTPException
-from server.database import programsCOL, specialisationsCOL
+import functools
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException
+from server.conditional_get import conditional_get
+from server.datasets import loaded
+from server.handbook import PROGRAMS, SPECIALISATIONS
 from server.routers.model import SpecialisationTypes, Specialisations
-from data.processors.models import Program
 
 router = APIRouter(
     prefix="/specialisations",
@@ -19,13 +21,14 @@ def specialisations_index():
 @router.get(
     "/getSpecialisationTypes/{programCode}",
     response_model=SpecialisationTypes,
+    dependencies=[Depends(loaded(PROGRAMS))],
     responses={
         200: {"types": ["majors", "minors"]}
     }
 )
-def get_specialisation_types(programCode):
+async def get_specialisation_types(programCode):
     """ get the possible types of a program """
-    result = programsCOL.find_one({"code": programCode})
+    result = PROGRAMS.get().get(programCode)
 
     if not result:
         raise HTTPException(
@@ -36,6 +39,7 @@ def get_specialisation_types(programCode):
 @router.get(
     "/getSpecialisations/{programCode}/{typeSpec}",
     response_model=Specialisations,
+    dependencies=[Depends(conditional_get), Depends(loaded(PROGRAMS, SPECIALISATIONS))],
     responses={
         400: {
             "description": "The given program code could not be found in the database",
@@ -66,9 +70,18 @@ def get_specialisation_types(programCode):
         },
     },
 )
-def get_specialisations(programCode: str, typeSpec: Literal["majors"] | Literal["minors"] | Literal["honours"]):
+async def get_specialisations(programCode: str, typeSpec: Literal["majors"] | Literal["minors"] | Literal["honours"]):
     """ Fetch all the majors known to the backend for a specific program """
-    result = cast(Optional[Program], programsCOL.find_one({"code": programCode}))
+    return get_known_specialisations(programCode, typeSpec)
+
+@functools.lru_cache(maxsize=1024)
+def get_known_specialisations(programCode: str, typeSpec: Literal["majors", "minors", "honours"]) -> dict:
+    """
+    The program's specialisations of the given type, less any which are not
+    known to the backend. Worked out once per (program, type).
+    NOTE: the result is shared with every other request - do not mutate it
+    """
+    result = PROGRAMS.get().get(programCode)
 
     if not result:
         raise HTTPException(
@@ -79,9 +92,11 @@ def get_specialisations(programCode: str, typeSpec: Literal["majors"] | Literal[
         raise HTTPException(
             status_code=404, detail=f"this program has no {typeSpec}")
 
-    for item in specRes.values():
-        for code in [*item["specs"].keys()]:
-            if not specialisationsCOL.find_one({"code": code}):
-                del item["specs"][code]
-
-    return {"spec": result["components"]["spec_data"].get(typeSpec)}
+    known = SPECIALISATIONS.get().keys()
+    return {"spec": {
+        name: {
+            **item,
+            "specs": {code: title for code, title in item["specs"].items() if code in known},
+        }
+        for name, item in specRes.items()
+    }}
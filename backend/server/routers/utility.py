@@ -3,14 +3,16 @@ General purpose utility functions for the server, that do not fit
 specifically in any one function
 """
 
-
-from typing import Callable, Optional, TypeVar
+import functools
+import itertools
+from typing import Callable, Optional, Tuple, TypeVar
 from algorithms.objects.course import Course
 
 from data.utility import data_helpers
+from server.datasets import dataset
 from server.routers.model import CONDITIONS, ProgramTime
 
-COURSES = data_helpers.read_data("data/final_data/coursesProcessed.json")
+COURSES = dataset("processed_courses", lambda: data_helpers.read_data("data/final_data/coursesProcessed.json"))
 
 R = TypeVar('R')
 def map_suppressed_errors(func: Callable[..., R], errors_log: list[tuple], *args, **kwargs) -> Optional[R]:
@@ -25,20 +27,26 @@ def map_suppressed_errors(func: Callable[..., R], errors_log: list[tuple], *args
     return None
 
 
-def get_core_courses(program: str, specialisations: list[str]):
+def get_core_courses(program: str, specialisations: list[str]) -> list[str]:
+    """
+    Returns the core courses of the majors and honours of the given program
+    and specialisations. These never depend on the user's courses, so they
+    are only worked out once per (program, specialisations).
+    """
+    return list(_get_core_courses(program, tuple(sorted(specialisations))))
+
+@functools.lru_cache(maxsize=512)
+def _get_core_courses(program: str, specialisations: Tuple[str, ...]) -> Tuple[str, ...]:
     from server.routers.programs import get_structure
 
     req = get_structure(program, "+".join(specialisations))
-    return sum(
-            (
-                sum((
-                    list(value["courses"].keys())
-                    for sub_group, value in spec["content"].items()
-                    if 'core' in sub_group.lower()
-                ), [])
-            for spec_name, spec in req["structure"].items()
-            if "Major" in spec_name or "Honours" in spec_name)
-         , [])
+    return tuple(itertools.chain.from_iterable(
+        value["courses"].keys()
+        for spec_name, spec in req["structure"].items()
+        if "Major" in spec_name or "Honours" in spec_name
+        for sub_group, value in spec["content"].items()
+        if 'core' in sub_group.lower()
+    ))
 
 
 def get_course_object(code: str, prog_time: ProgramTime, locked_offering: Optional[tuple[int, int]] = None, mark: Optional[int] = 100) -> Course:
@@ -60,7 +68,7 @@ def get_course_object(code: str, prog_time: ProgramTime, locked_offering: Option
             code,
             CONDITIONS[code],
             mark,
-            COURSES[code]["UOC"],
+            COURSES.get()[code]["UOC"],
             terms_possible,
             locked_offering
         )
@@ -0,0 +1,69 @@
+"""
+A trigram inverted index over course codes and titles.
+
+Used by `/courses/searchCourse` to cut the full catalogue down to a small set
+of candidates before they are scored with the (much slower) fuzzy matching.
+"""
+
+import heapq
+import re
+from collections import Counter
+from operator import itemgetter
+from typing import Dict, List, Set, Tuple
+
+# The most candidates handed back for a single search
+MAX_CANDIDATES = 500
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Returns the trigrams of every word in the given text. Words are padded
+    (two spaces in front, one behind) so that short words and the start of
+    words still produce trigrams.
+    """
+    return {
+        padded[i:i + 3]
+        for word in re.split(r"[^a-z0-9]+", text.lower()) if word
+        for padded in [f"  {word} "]
+        for i in range(len(padded) - 2)
+    }
+
+
+class CourseSearchIndex:
+    """ Maps each trigram to the courses whose code or title contain it """
+
+    def __init__(self, courses: Dict[str, str]):
+        # position in this list is the course's id in the postings lists
+        self.courses: List[Tuple[str, str]] = list(courses.items())
+        self.postings: Dict[str, List[int]] = {}
+        # course id -> how many distinct trigrams its code and title have
+        self.sizes: List[int] = []
+        for course_id, (code, title) in enumerate(self.courses):
+            course_trigrams = trigrams(code) | trigrams(title)
+            self.sizes.append(len(course_trigrams))
+            for trigram in course_trigrams:
+                self.postings.setdefault(trigram, []).append(course_id)
+
+    def candidates(self, search_string: str, limit: int = MAX_CANDIDATES) -> List[Tuple[str, str]]:
+        """
+        Returns up to `limit` (code, title) pairs, in the same order as the
+        courses the index was built from.
+        Courses are ranked before the cut by how many trigrams they share with
+        the search string; ties go to the course whose code and title that
+        overlap covers more of (so "COMP1511" beats a long title which merely
+        mentions "comp"), and only then to the courses that appear first.
+        Falls back to every course if the search string has no trigrams.
+        """
+        query = trigrams(search_string)
+        if not query:
+            return self.courses
+
+        counts: Counter[int] = Counter()
+        for trigram in query:
+            counts.update(self.postings.get(trigram, []))
+
+        best = heapq.nlargest(
+            limit, counts.items(),
+            key=lambda item: (item[1], item[1] / self.sizes[item[0]], -item[0])
+        )
+        return [self.courses[course_id] for course_id in sorted(map(itemgetter(0), best))]
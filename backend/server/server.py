@@ -2,12 +2,22 @@
 Configure the FastAPI server
 """
 
+import logging
+import threading
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from data.config import LIVE_YEAR
 
+from server.datasets import DATASETS, datasets_ready, load_datasets
+from server.repository import get_repository
+from server.responses import CompressionMiddleware
 from server.routers import courses, planner, programs, specialisations, followups
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI()
 
 origins = [
@@ -39,6 +49,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
 
 app.include_router(planner.router)
 app.include_router(courses.router)
@@ -49,12 +60,52 @@ app.include_router(followups.router)
 # app.include_router(ctf.router)
 
 
+def load_data() -> None:
+    """ waits for the storage, then loads every dataset so that no request has to wait on one """
+    try:
+        get_repository().connect()
+        load_datasets()
+    except Exception:  # pylint: disable=broad-except
+        # `/ready` keeps answering 503; requests still load what they need on the spot
+        logger.exception("Failed to load the datasets")
+
+@app.on_event("startup")
+def start_loading_data() -> None:
+    """
+    Loads the data in the background, so that the server starts answering
+    straight away and `/ready` reports 503 until everything is loaded
+    """
+    threading.Thread(target=load_data, name="load-data", daemon=True).start()
+
+
 @app.get("/")
 async def index() -> str:
     """ sanity test that this file is loaded """
     return "At index inside server.py"
 
 @app.get("/live_year")
-def live_year() -> int:
+async def live_year() -> int:
     """ sanity check for the live year """
     return LIVE_YEAR
+
+@app.get("/health")
+async def health() -> JSONResponse:
+    """ whether the configured storage backend is reachable """
+    # the repository may still be being created (and loading) on startup
+    repository = await run_in_threadpool(get_repository)
+    healthy = await repository.healthy()
+    return JSONResponse(status_code=200 if healthy else 503, content={"backend": repository.name, "healthy": healthy})
+
+@app.get("/ready")
+async def ready() -> JSONResponse:
+    """ whether every dataset has been loaded, along with how long each took """
+    return JSONResponse(
+        status_code=200 if datasets_ready() else 503,
+        content={
+            "ready": datasets_ready(),
+            "datasets": [
+                handle.stats.dict() if handle.stats is not None else {"name": name}
+                for name, handle in DATASETS.items()
+            ],
+        },
+    )
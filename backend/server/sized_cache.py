@@ -0,0 +1,60 @@
+"""
+A least-recently-used cache bounded by the memory its entries use, rather
+than by how many entries it holds.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Tuple, TypeVar
+
+from server.datasets import deep_sizeof
+
+T = TypeVar("T")
+
+
+class SizedLRUCache(Generic[T]):
+    """
+    Maps keys to values built on demand. Once the entries use more than
+    `max_bytes`, the least recently used are evicted.
+
+    NOTE: values are shared between every caller; they must not be mutated.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, Tuple[T, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, build: Callable[[], T]) -> T:
+        """ Returns the value for the key, building (and caching) it if it is missing """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+
+        # built outside the lock; two requests racing on the same key both
+        # build it, and the first one in is kept
+        value = build()
+        size = deep_sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key][0]
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
@@ -0,0 +1,15 @@
+import requests
+
+
+def test_course_children():
+    x = requests.get('http://127.0.0.1:8000/courses/courseChildren/COMP1511')
+    assert x.status_code == 200
+    assert x.json()["original"] == "COMP1511"
+    assert "COMP1521" in x.json()["courses"]
+    assert "COMP1531" in x.json()["courses"]
+    assert "COMP2521" in x.json()["courses"]
+
+
+def test_course_children_invalid_course():
+    x = requests.get('http://127.0.0.1:8000/courses/courseChildren/BADC0000')
+    assert x.status_code == 400
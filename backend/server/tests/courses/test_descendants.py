@@ -0,0 +1,33 @@
+import requests
+
+
+def test_descendants():
+    x = requests.get('http://127.0.0.1:8000/courses/descendants/COMP1511')
+    assert x.status_code == 200
+    assert "COMP2521" in x.json()["courses"]
+    assert "COMP3900" in x.json()["courses"]
+    assert "COMP1511" not in x.json()["courses"]
+
+
+def test_descendants_depth():
+    x = requests.get('http://127.0.0.1:8000/courses/descendants/COMP1511?depth=1')
+    y = requests.get('http://127.0.0.1:8000/courses/courseChildren/COMP1511')
+    assert sorted(x.json()["courses"]) == sorted(y.json()["courses"])
+
+    z = requests.get('http://127.0.0.1:8000/courses/descendants/COMP1511?depth=0')
+    assert z.json()["courses"] == []
+
+
+def test_ancestors():
+    x = requests.get('http://127.0.0.1:8000/courses/ancestors/COMP3900')
+    assert x.status_code == 200
+    assert "COMP1511" in x.json()["courses"]
+    assert "COMP2521" in x.json()["courses"]
+
+    y = requests.get('http://127.0.0.1:8000/courses/ancestors/COMP3900?depth=1')
+    assert set(y.json()["courses"]) < set(x.json()["courses"])
+
+
+def test_unknown_course():
+    x = requests.get('http://127.0.0.1:8000/courses/descendants/COMP0000')
+    assert x.status_code == 400
@@ -0,0 +1,42 @@
+import json
+import requests
+
+
+def test_dump_all_courses():
+    x = requests.get('http://127.0.0.1:8000/courses/dump')
+    assert x.status_code == 200
+    courses = {course["code"]: course for course in x.json()}
+    assert courses["COMP1511"]["is_legacy"] is False
+    assert courses["ENGG1000"]["is_legacy"] is True
+
+
+def test_dump_not_modified():
+    x = requests.get('http://127.0.0.1:8000/courses/dump')
+    assert x.status_code == 200
+    etag = x.headers["ETag"]
+
+    y = requests.get('http://127.0.0.1:8000/courses/dump', headers={"If-None-Match": etag})
+    assert y.status_code == 304
+    assert y.headers["ETag"] == etag
+
+
+def test_dump_ndjson():
+    x = requests.get('http://127.0.0.1:8000/courses/dump')
+    y = requests.get('http://127.0.0.1:8000/courses/dump?format=ndjson')
+    assert y.status_code == 200
+    assert y.headers["ETag"] != x.headers["ETag"]
+    assert [json.loads(line) for line in y.text.splitlines()] == x.json()
+
+
+def test_dump_etag_per_format():
+    x = requests.get('http://127.0.0.1:8000/courses/dump')
+    assert "Accept" in x.headers["Vary"]
+
+    # the json dump's tag doesn't validate the ndjson one
+    y = requests.get(
+        'http://127.0.0.1:8000/courses/dump',
+        headers={"Accept": "application/x-ndjson", "If-None-Match": x.headers["ETag"]}
+    )
+    assert y.status_code == 200
+    assert y.headers["Content-Type"].startswith("application/x-ndjson")
+    assert "Accept" in y.headers["Vary"]
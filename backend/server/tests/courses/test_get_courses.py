@@ -0,0 +1,27 @@
+import requests
+
+
+def test_get_many_courses():
+    x = requests.post('http://127.0.0.1:8000/courses/getCourses', json={
+        "courses": ["COMP1511", "ENGG1000", "COMP1234"],
+    })
+    assert x.status_code == 200
+    assert x.json()["courses"]["COMP1511"]["UOC"] == 6
+    assert x.json()["courses"]["COMP1511"]["is_legacy"] is False
+    assert x.json()["courses"]["ENGG1000"]["is_legacy"] is True
+    assert list(x.json()["errors"]) == ["COMP1234"]
+
+
+def test_matches_get_course():
+    x = requests.post('http://127.0.0.1:8000/courses/getCourses', json={"courses": ["COMP1521"]})
+    y = requests.get('http://127.0.0.1:8000/courses/getCourse/COMP1521')
+    assert x.json()["courses"]["COMP1521"] == y.json()
+
+
+def test_legacy_year():
+    x = requests.post('http://127.0.0.1:8000/courses/getCourses', json={
+        "courses": ["COMP1511"],
+        "year": 2019,
+    })
+    assert x.status_code == 200
+    assert x.json()["courses"]["COMP1511"]["is_legacy"] is True
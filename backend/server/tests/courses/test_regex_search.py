@@ -0,0 +1,30 @@
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+import re
+
+from server.catalogue import get_catalogue
+from server.routers.courses import regex_search
+
+
+def test_regex_search_live_courses():
+    courses = regex_search("^COMP15")
+    assert "COMP1511" in courses
+    assert courses == {
+        code: course["title"] for code, course in get_catalogue().courses.items()
+        if not course["is_legacy"] and code.startswith("COMP15")
+    }
+
+
+def test_regex_search_ignores_case():
+    assert regex_search("^comp15") == regex_search("^COMP15")
+
+
+def test_regex_search_falls_back_to_archives():
+    catalogue = get_catalogue()
+    legacy = next(code for code, course in catalogue.courses.items() if course["is_legacy"])
+    courses = regex_search(rf"^{re.escape(legacy)}$")
+    assert list(courses) == [legacy]
+
+
+def test_regex_search_no_match():
+    assert regex_search("^NOPE") == {}
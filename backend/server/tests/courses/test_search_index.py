@@ -0,0 +1,50 @@
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+from server.search_index import CourseSearchIndex, trigrams
+
+COURSES = {
+    "COMP1511": "Programming Fundamentals",
+    "COMP1521": "Computer Systems Fundamentals",
+    "COMP1531": "Software Engineering Fundamentals",
+    "MATH1131": "Mathematics 1A",
+    "DPST1091": "Introduction to Programming",
+    "ARTS1000": "Computing, Compilers and Composition in the Arts",
+}
+
+
+def test_trigrams_pad_words():
+    assert trigrams("Ab") == {"  a", " ab", "ab "}
+    assert trigrams("") == set()
+
+
+def test_exact_code_hit():
+    index = CourseSearchIndex(COURSES)
+    assert index.candidates("COMP1521", limit=1) == [("COMP1521", "Computer Systems Fundamentals")]
+
+
+def test_title_hit():
+    index = CourseSearchIndex(COURSES)
+    codes = [code for code, _ in index.candidates("programming", limit=2)]
+    assert codes == ["COMP1511", "DPST1091"]
+
+
+def test_no_trigrams_returns_everything():
+    index = CourseSearchIndex(COURSES)
+    assert index.candidates("!!") == list(COURSES.items())
+
+
+def test_truncation_keeps_best_matches_in_catalogue_order():
+    index = CourseSearchIndex(COURSES)
+    candidates = index.candidates("comp", limit=3)
+    assert len(candidates) == 3
+    # every COMP course shares as many trigrams as ARTS1000's title, but the
+    # overlap covers more of them, so they win the cut despite ARTS1000 being last
+    assert [code for code, _ in candidates] == ["COMP1511", "COMP1521", "COMP1531"]
+
+
+def test_truncation_ranks_before_cutting():
+    # the best match is last in the catalogue, so cutting in catalogue order would lose it
+    courses = {f"COMP9{i:03}": "Unrelated" for i in range(20)} | {"COMP1511": "Programming Fundamentals"}
+    index = CourseSearchIndex(courses)
+    assert index.candidates("COMP1511", limit=5)[-1] == ("COMP1511", "Programming Fundamentals")
+    assert len(index.candidates("COMP1511", limit=5)) == 5
@@ -24,3 +24,21 @@ def test_multiple_dependencies():
 def test_invalid_course():
     x = requests.post('http://127.0.0.1:8000/courses/unselectCourse/BADC0000', json=USERS["user6"])
     assert x.status_code == 200
+
+def test_multi_level_cascade():
+    # COMP1511 -> COMP2521 -> COMP3121 -> COMP4121, while MATH1131 depends on none of them
+    user = copy.deepcopy(USERS["user6"])
+    user["courses"] = {
+        "COMP1511": [6, 80], "COMP2521": [6, 70], "COMP3121": [6, 65], "COMP4121": [6, 75], "MATH1131": [6, 60],
+    }
+    x = requests.post("http://127.0.0.1:8000/courses/unselectCourse/COMP1511", json=user)
+    assert x.status_code == 200
+    assert x.json()["courses"] == ["COMP1511", "COMP2521", "COMP3121", "COMP4121"]
+
+def test_failed_course_is_affected_once():
+    # a failed course can't be popped like a passed one, so it must not be retried forever
+    user = copy.deepcopy(USERS["user6"])
+    user["courses"]["COMP2521"] = [6, 40]
+    x = requests.post("http://127.0.0.1:8000/courses/unselectCourse/COMP1511", json=user, timeout=10)
+    assert x.status_code == 200
+    assert x.json()["courses"] == ["COMP1511", "COMP1521", "COMP1531", "COMP2521", "COMP3231", "COMP9242"]
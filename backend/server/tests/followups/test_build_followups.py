@@ -0,0 +1,41 @@
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+from data.processors.enrolment_processing import add_enrolment_year, build_followups
+
+# course -> term -> hashed zIDs enrolled
+YEAR_2021 = {
+    "COMP1511": {"T3": ["a", "b", "c"]},
+}
+YEAR_2022 = {
+    "COMP1511": {"T1": ["a", "b", "c", "d"]},
+    "COMP1521": {"T0": ["a"], "T2": ["b", "c", "d"]},
+    "COMP1010": {"T2": ["c"]},
+    "COMP2521": {"T3": ["b", "d"]},
+}
+
+def store():
+    enrolments = add_enrolment_year({"students": [], "years": {}}, 2022, YEAR_2022)
+    return add_enrolment_year(enrolments, 2021, YEAR_2021)
+
+
+def test_counts_followups_in_next_term():
+    followups = build_followups(store())
+    assert followups["COMP1511"]["T1"] == [
+        ("COMP1521", {"T2": 3}),
+        # sorts before the origin, so must still be counted
+        ("COMP1010", {"T2": 1}),
+    ]
+    assert followups["COMP1521"]["T2"] == [("COMP2521", {"T3": 2})]
+
+
+def test_T3_followed_by_summer_and_T1():
+    followups = build_followups(store())
+    # the summer term is T0, counted in the year after T3
+    assert followups["COMP1511"]["T3"] == [("COMP1511", {"T1": 3}), ("COMP1521", {"T0": 1})]
+    assert set(followups["COMP1511"]) == {"T1", "T3"}
+
+
+def test_no_followups_without_next_term():
+    followups = build_followups(store())
+    assert "COMP2521" not in followups
+    assert "COMP1010" not in followups
@@ -39,3 +39,27 @@ def test_get_followups_COMP3331():
     assert x.json()['originTerm'] == "T2"
     assert x.json()['followups']['COMP4920'] == { 'T3': 63 }
     assert x.json()['followups']['COMP3900'] == { 'T3': 36 }
+
+def test_get_followups_every_term():
+    for term in ['T0', 'T1', 'T2', 'T3']:
+        x = requests.get(f'http://127.0.0.1:8000/followups/getFollowups/COMP1511/{term}')
+
+        assert x.status_code == 200
+        assert x.json()['originTerm'] == term
+        for counts in x.json()['followups'].values():
+            # T3 is followed by the next year's summer term and T1
+            assert set(counts) <= ({'T0', 'T1'} if term == 'T3' else {f'T{int(term[1]) + 1}'})
+
+def test_followups_before_origin():
+    # every course is a candidate followup, not just those after the origin alphabetically
+    x = requests.get('http://127.0.0.1:8000/followups/getFollowups/COMP3331/T2')
+
+    assert x.status_code == 200
+    assert x.json()['followups']['COMP2511'] == { 'T3': 40 }
+
+def test_summer_term_is_T0():
+    x = requests.get('http://127.0.0.1:8000/followups/getFollowups/COMP1511/S')
+    assert x.status_code == 400
+
+    x = requests.get('http://127.0.0.1:8000/followups/getFollowups/COMP1511/T0')
+    assert x.status_code == 200
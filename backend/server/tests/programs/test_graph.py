@@ -0,0 +1,33 @@
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+import requests
+
+
+def test_graph_edges():
+    x = requests.get('http://127.0.0.1:8000/programs/graph/3778/COMPA1')
+    assert x.status_code == 200
+    edges = x.json()["edges"]
+    assert {"source": "COMP1511", "target": "COMP1521"} in edges
+    courses = set(x.json()["courses"])
+    assert all(edge["source"] in courses and edge["target"] in courses for edge in edges)
+
+
+def test_compact_graph_matches_edges():
+    x = requests.get('http://127.0.0.1:8000/programs/graph/3778/COMPA1')
+    y = requests.get('http://127.0.0.1:8000/programs/graph/3778/COMPA1?format=compact')
+    assert y.status_code == 200
+
+    nodes = y.json()["courses"]
+    assert len(nodes) == len(set(nodes))
+    assert set(nodes) == set(x.json()["courses"])
+    # compared as sets, since the edges format repeats an edge when a course
+    # appears in more than one container of the structure
+    assert {(nodes[source], nodes[target]) for source, target in y.json()["edges"]} == {
+        (edge["source"], edge["target"]) for edge in x.json()["edges"]
+    }
+
+
+def test_compact_graph_etag_differs():
+    x = requests.get('http://127.0.0.1:8000/programs/graph/3778/COMPA1')
+    y = requests.get('http://127.0.0.1:8000/programs/graph/3778/COMPA1?format=compact')
+    assert x.headers["ETag"] != y.headers["ETag"]
@@ -0,0 +1,37 @@
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+import copy
+
+import pytest
+
+from server.routers.programs import (build_program_graph, build_structure, get_structure,
+                                     get_structure_course_list, get_structure_gen_eds)
+from server.routers.utility import get_core_courses
+
+STRUCTURES = [
+    ("3778", "COMPA1", None),
+    ("3778", "COMPA1+MATHC2", None),
+    ("3778", "COMPA1", "gened"),
+    ("3707", "AEROAH", None),
+]
+
+
+@pytest.mark.parametrize("programCode,spec,ignore", STRUCTURES)
+def test_cached_structure_matches_fresh_build(programCode, spec, ignore):
+    cached = get_structure(programCode, spec, ignore)
+    assert get_structure(programCode, spec, ignore) is cached
+    assert cached == build_structure(programCode, spec, ignore)
+
+
+@pytest.mark.parametrize("programCode,spec,ignore", STRUCTURES)
+def test_requests_cannot_mutate_cached_structure(programCode, spec, ignore):
+    before = copy.deepcopy(get_structure(programCode, spec, ignore))
+
+    # everything else which reads the shared structure
+    get_structure_course_list(programCode, spec)
+    get_structure_gen_eds(programCode)
+    get_core_courses(programCode, spec.split("+"))
+    build_program_graph(programCode, spec)
+
+    assert get_structure(programCode, spec, ignore) == before
+    assert before == build_structure(programCode, spec, ignore)
@@ -0,0 +1,55 @@
+import requests
+
+from server import conditional_get
+
+
+def test_get_course_not_modified():
+    x = requests.get('http://127.0.0.1:8000/courses/getCourse/COMP1511')
+    assert x.status_code == 200
+    assert x.headers["Cache-Control"] == "public, no-cache"
+    etag = x.headers["ETag"]
+
+    y = requests.get('http://127.0.0.1:8000/courses/getCourse/COMP1511', headers={"If-None-Match": etag})
+    assert y.status_code == 304
+    assert y.headers["ETag"] == etag
+    assert y.content == b""
+
+
+def test_etag_differs_between_requests():
+    x = requests.get('http://127.0.0.1:8000/programs/getStructure/3778/COMPA1')
+    y = requests.get('http://127.0.0.1:8000/programs/getStructure/3778/COMPS1')
+    assert x.headers["ETag"] != y.headers["ETag"]
+
+    z = requests.get('http://127.0.0.1:8000/programs/getStructure/3778/COMPS1', headers={"If-None-Match": x.headers["ETag"]})
+    assert z.status_code == 200
+
+
+def test_no_last_modified():
+    # file times say nothing about the code that built the response, so only ETags validate
+    x = requests.get('http://127.0.0.1:8000/courses/getPathFrom/COMP2521')
+    assert x.status_code == 200
+    assert "Last-Modified" not in x.headers
+
+    y = requests.get('http://127.0.0.1:8000/courses/getPathFrom/COMP2521', headers={"If-Modified-Since": "Mon, 01 Jan 2052 00:00:00 GMT"})
+    assert y.status_code == 200
+
+
+def test_data_version_tracks_code(tmp_path, monkeypatch):
+    (tmp_path / "data.json").write_text("{}")
+    (tmp_path / "code").mkdir()
+    (tmp_path / "code" / "route.py").write_text("A = 1")
+    monkeypatch.setattr(conditional_get, "DATA_VERSION_PATHS", [str(tmp_path / "data.json")])
+    monkeypatch.setattr(conditional_get, "CODE_VERSION_PATHS", [str(tmp_path / "code")])
+    monkeypatch.setattr(conditional_get, "APP_VERSION", None)
+
+    before = conditional_get.load_data_version()
+    (tmp_path / "code" / "route.py").write_text("A = 2")
+    assert conditional_get.load_data_version() != before
+
+    # a deployment's version stands in for the source
+    monkeypatch.setattr(conditional_get, "APP_VERSION", "1.2.3")
+    pinned = conditional_get.load_data_version()
+    (tmp_path / "code" / "route.py").write_text("A = 3")
+    assert conditional_get.load_data_version() == pinned
+    monkeypatch.setattr(conditional_get, "APP_VERSION", "1.2.4")
+    assert conditional_get.load_data_version() != pinned
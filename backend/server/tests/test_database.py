@@ -0,0 +1,51 @@
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+import asyncio
+import os
+import threading
+
+from anyio import to_thread
+
+# the client never connects for these tests, but needs credentials to be built
+os.environ.setdefault("MONGODB_USERNAME", "test")
+os.environ.setdefault("MONGODB_PASSWORD", "test")
+os.environ.setdefault("MONGODB_SERVICE_HOSTNAME", "localhost")
+
+from server import database  # pylint: disable=wrong-import-position
+from server.config import MONGODB_MAX_POOL_SIZE  # pylint: disable=wrong-import-position
+
+
+def test_run_query_while_route_threadpool_saturated():
+    async def main():
+        limiter = to_thread.current_default_thread_limiter()
+        limiter.total_tokens = 1
+        release = threading.Event()
+        # holds the only thread the sync routes could run on
+        blocked = asyncio.create_task(to_thread.run_sync(release.wait))
+        await asyncio.sleep(0.05)
+        assert limiter.borrowed_tokens == 1
+
+        assert await asyncio.wait_for(database.run_query(sum, [1, 2, 3]), timeout=5) == 6
+
+        release.set()
+        await blocked
+
+    asyncio.run(main())
+
+
+def test_run_query_queues_while_executor_saturated():
+    async def main():
+        release = threading.Event()
+        loop = asyncio.get_running_loop()
+        busy = [loop.run_in_executor(database._executor, release.wait) for _ in range(MONGODB_MAX_POOL_SIZE)]  # pylint: disable=protected-access
+
+        query = asyncio.create_task(database.run_query(sum, [1, 2, 3]))
+        # the query waits for a free thread, while the event loop keeps running
+        await asyncio.sleep(0.1)
+        assert not query.done()
+
+        release.set()
+        assert await asyncio.wait_for(query, timeout=5) == 6
+        await asyncio.gather(*busy)
+
+    asyncio.run(main())
@@ -0,0 +1,23 @@
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+import asyncio
+import threading
+
+from server.datasets import Dataset, loaded
+
+
+def test_get_async_does_not_block_event_loop():
+    release = threading.Event()
+    handle = Dataset("slow", lambda: release.wait(5) and {"COMP1511": "Programming Fundamentals"})
+
+    async def main():
+        waiting = asyncio.create_task(loaded(handle)())
+        # the loop keeps serving other requests while the data loads
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        release.set()
+        await asyncio.wait_for(waiting, timeout=5)
+        assert await handle.get_async() == {"COMP1511": "Programming Fundamentals"}
+
+    asyncio.run(main())
+    assert handle.loaded
@@ -0,0 +1,70 @@
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+import os
+import pickle
+
+from algorithms.objects.program_restrictions import ProgramRestriction
+from algorithms.objects.user import User
+from server import program_restrictions
+from server.program_restrictions import ProgramRestrictionRegistry
+
+
+class AllowOnly(ProgramRestriction):
+    """ Only allows the given courses """
+
+    def __init__(self, *courses: str):
+        self.courses = set(courses)
+
+    def validate_course_allowed(self, user: User, course: str) -> bool:
+        return course in self.courses
+
+    def __str__(self) -> str:
+        return f"AllowOnly({', '.join(sorted(self.courses))})"
+
+
+def write_restrictions(path, restrictions, mtime):
+    with open(path, "wb") as file:
+        pickle.dump(restrictions, file)
+    os.utime(path, (mtime, mtime))
+
+
+def user_in(program):
+    user = User()
+    user.program = program
+    return user
+
+
+def test_reloads_rewritten_artefact(tmp_path, monkeypatch):
+    monkeypatch.setattr(program_restrictions, "CHECK_INTERVAL", 0)
+    path = tmp_path / "program_restrictions.pkl"
+    write_restrictions(path, {"3778": AllowOnly("COMP1511")}, 1_000_000)
+    registry = ProgramRestrictionRegistry(str(path))
+
+    assert registry.validate_course_allowed(user_in("3778"), "COMP1511")
+    assert not registry.validate_course_allowed(user_in("3778"), "COMP1521")
+
+    write_restrictions(path, {"3778": AllowOnly("COMP1521")}, 2_000_000)
+    assert not registry.validate_course_allowed(user_in("3778"), "COMP1511")
+    assert registry.validate_course_allowed(user_in("3778"), "COMP1521")
+    # programs without a restriction allow everything
+    assert registry.validate_course_allowed(user_in("3707"), "COMP1511")
+
+
+def test_unchanged_artefact_not_unpickled_again(tmp_path, monkeypatch):
+    monkeypatch.setattr(program_restrictions, "CHECK_INTERVAL", 0)
+    unpickled = []
+    loads = pickle.loads
+    monkeypatch.setattr(program_restrictions.pickle, "loads", lambda data: unpickled.append(1) or loads(data))
+    path = tmp_path / "program_restrictions.pkl"
+    write_restrictions(path, {"3778": AllowOnly("COMP1511")}, 1_000_000)
+    registry = ProgramRestrictionRegistry(str(path))
+
+    restrictions = registry.load()
+    registry.get("3778")
+    assert len(unpickled) == 1
+
+    # rewritten with the same contents: the hash matches, so nothing is unpickled
+    write_restrictions(path, {"3778": AllowOnly("COMP1511")}, 2_000_000)
+    registry.get("3778")
+    assert len(unpickled) == 1
+    assert registry.load() is restrictions
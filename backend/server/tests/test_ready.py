@@ -0,0 +1,31 @@
+import time
+
+import requests
+
+
+def wait_until_ready(timeout: float = 60) -> requests.Response:
+    """ The data loads in the background after startup, so `/ready` answers 503 until it is done """
+    deadline = time.monotonic() + timeout
+    while True:
+        x = requests.get('http://127.0.0.1:8000/ready')
+        if x.status_code != 503 or time.monotonic() > deadline:
+            return x
+        assert x.json()["ready"] is False
+        time.sleep(0.5)
+
+
+def test_ready_after_startup():
+    x = wait_until_ready()
+    assert x.status_code == 200
+    assert x.json()["ready"] is True
+    names = {dataset["name"] for dataset in x.json()["datasets"]}
+    assert {"catalogue", "compiled_conditions", "graph"} <= names
+    for dataset in x.json()["datasets"]:
+        assert dataset["seconds"] >= 0
+        assert dataset["bytes"] > 0
+
+def test_health():
+    x = requests.get('http://127.0.0.1:8000/health')
+    assert x.status_code == 200
+    assert x.json()["healthy"] is True
+    assert x.json()["backend"] in ("mongo", "memory")
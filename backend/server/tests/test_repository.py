@@ -0,0 +1,93 @@
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+import json
+
+import pytest
+
+from server.catalogue import CourseCatalogue
+from server.repository import MemoryRepository, load_repository
+
+
+def course(code, title, terms):
+    return {"code": code, "title": title, "terms": terms, "UOC": 6}
+
+COURSES = {
+    "COMP1511": course("COMP1511", "Programming Fundamentals", ["T1", "T2", "T3"]),
+    "COMP1521": course("COMP1521", "Computer Systems Fundamentals", ["T2"]),
+}
+ARCHIVES = {
+    2021: {
+        "COMP1511": course("COMP1511", "Programming Fundamentals (2021)", ["T1"]),
+        "COMP1911": course("COMP1911", "Computing 1A (2021)", ["T1", "T3"]),
+    },
+    2022: {
+        "COMP1911": course("COMP1911", "Computing 1A", ["T3"]),
+        "COMP1917": course("COMP1917", "Computing 1", ["T1"]),
+    },
+}
+
+
+@pytest.fixture(name="repository")
+def fixture_repository(tmp_path):
+    (tmp_path / "archive").mkdir()
+    (tmp_path / "coursesProcessed.json").write_text(json.dumps(COURSES))
+    (tmp_path / "programsProcessed.json").write_text(json.dumps({"3778": {"code": "3778", "title": "Computer Science"}}))
+    (tmp_path / "specialisationsProcessed.json").write_text(json.dumps({"COMPA1": {"code": "COMPA1", "name": "Computer Science"}}))
+    for year, courses in ARCHIVES.items():
+        (tmp_path / "archive" / f"{year}.json").write_text(json.dumps(courses))
+    return MemoryRepository(f"{tmp_path}/", f"{tmp_path}/archive/", list(ARCHIVES))
+
+
+def test_memory_repository(repository):
+    assert repository.name == "memory"
+    assert sorted(c["code"] for c in repository.courses()) == ["COMP1511", "COMP1521"]
+    assert [p["code"] for p in repository.programs()] == ["3778"]
+    assert [s["code"] for s in repository.specialisations()] == ["COMPA1"]
+    assert sorted(c["code"] for c in repository.archived_courses(2021)) == ["COMP1511", "COMP1911"]
+    assert repository.archived_courses("2022") == repository.archived_courses(2022)
+    assert repository.archived_courses(2019) == []
+
+
+def test_catalogue_lookups(repository):
+    catalogue = CourseCatalogue(
+        repository.courses(), {str(year): repository.archived_courses(year) for year in ARCHIVES}
+    )
+
+    # by code: the live year first, then the newest archived year
+    assert catalogue.get_course("COMP1511")["title"] == "Programming Fundamentals"
+    assert catalogue.get_course("COMP1511")["is_legacy"] is False
+    assert catalogue.get_course("COMP1911")["title"] == "Computing 1A"
+    assert catalogue.get_course("COMP1911")["is_legacy"] is True
+    assert catalogue.get_course("COMP9999") is None
+
+    # by year
+    assert catalogue.get_legacy_course("2021", "COMP1511")["title"] == "Programming Fundamentals (2021)"
+    assert catalogue.get_legacy_course("2022", "COMP1511") is None
+    assert sorted(catalogue.get_legacy_year("2022")) == ["COMP1911", "COMP1917"]
+    assert catalogue.get_legacy_year("2019") == {}
+
+    # by term, as `/courses/getLegacyCourses` filters them
+    assert sorted(
+        code for code, course in catalogue.get_legacy_year("2021").items() if "T1" in course["terms"]
+    ) == ["COMP1511", "COMP1911"]
+
+
+def test_backend_selection(monkeypatch):
+    monkeypatch.setattr("server.repository.STORAGE_BACKEND", "memory")
+    monkeypatch.setattr("server.repository.BACKENDS", {"memory": lambda: "memory repository", "mongo": lambda: "mongo repository"})
+    assert load_repository() == "memory repository"
+    assert load_repository("mongo") == "mongo repository"
+
+    monkeypatch.setattr("server.repository.STORAGE_BACKEND", "mongo")
+    assert load_repository() == "mongo repository"
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="STORAGE_BACKEND"):
+        load_repository("postgres")
+
+
+def test_missing_artefact_named(tmp_path):
+    (tmp_path / "programsProcessed.json").write_text("{}")
+    with pytest.raises(FileNotFoundError, match="coursesProcessed.json"):
+        MemoryRepository(f"{tmp_path}/", f"{tmp_path}/archive/", [])
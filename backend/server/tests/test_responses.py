@@ -0,0 +1,134 @@
+import asyncio
+import gzip
+from typing import List, Optional
+
+from server.responses import CompressionMiddleware, accepts_identity, compress, negotiate_encoding
+
+
+def test_negotiate_encoding_q_values():
+    assert negotiate_encoding("gzip;q=0.5, br;q=0.9", ("gzip", "br")) == "br"
+    assert negotiate_encoding("gzip;q=0.9, br;q=0.5", ("br", "gzip")) == "gzip"
+    # equal qualities go to the route's preference
+    assert negotiate_encoding("gzip, br", ("br", "gzip")) == "br"
+    assert negotiate_encoding("gzip, br", ("gzip", "br")) == "gzip"
+    assert negotiate_encoding("br;q=0, gzip", ("br", "gzip")) == "gzip"
+    assert negotiate_encoding("*;q=0.1, br;q=0", ("br", "gzip")) == "gzip"
+    assert negotiate_encoding("gzip;q=bad", ("gzip",)) is None
+    assert negotiate_encoding("identity", ("br", "gzip")) is None
+    assert negotiate_encoding("", ("br", "gzip")) is None
+
+
+def test_accepts_identity():
+    assert accepts_identity("")
+    assert accepts_identity("gzip")
+    assert not accepts_identity("gzip, identity;q=0")
+    assert not accepts_identity("gzip, *;q=0")
+    assert accepts_identity("*;q=0, identity")
+
+
+@compress(min_size=100, encodings=("gzip",))
+def compressed_route() -> None:
+    """ stands in for a route marked with `compress` """
+
+def plain_route() -> None:
+    """ stands in for a route which isn't """
+
+
+def run(
+    chunks: List[bytes],
+    accept_encoding: Optional[str] = "gzip",
+    status: int = 200,
+    endpoint=compressed_route,
+    etag: Optional[str] = None,
+):
+    """ Sends a response through the middleware, returning its status, headers and body """
+    async def app(scope, receive, send):
+        scope["endpoint"] = endpoint
+        headers = [(b"content-type", b"application/json")]
+        if etag is not None:
+            headers.append((b"etag", etag.encode()))
+        if len(chunks) == 1:
+            headers.append((b"content-length", str(len(chunks[0])).encode()))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        for i, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": i < len(chunks) - 1})
+
+    sent = []
+    async def send(message):
+        sent.append(message)
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    request_headers = [] if accept_encoding is None else [(b"accept-encoding", accept_encoding.encode())]
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": request_headers}
+    asyncio.run(CompressionMiddleware(app)(scope, receive, send))
+
+    start, *bodies = sent
+    headers = {name.decode().lower(): value.decode() for name, value in start["headers"]}
+    return start["status"], headers, b"".join(body.get("body", b"") for body in bodies)
+
+
+def test_compresses_large_bodies():
+    body = b"[" + b'"COMP1511",' * 50 + b"0]"
+    status, headers, sent = run([body])
+    assert status == 200
+    assert headers["content-encoding"] == "gzip"
+    assert headers["content-length"] == str(len(sent))
+    assert "Accept-Encoding" in headers["vary"]
+    assert gzip.decompress(sent) == body
+
+
+def test_small_bodies_sent_as_is():
+    status, headers, sent = run([b"[1, 2, 3]"])
+    assert status == 200
+    assert "content-encoding" not in headers
+    assert "Accept-Encoding" in headers["vary"]
+    assert sent == b"[1, 2, 3]"
+
+
+def test_small_bodies_compressed_when_identity_refused():
+    _, headers, sent = run([b"[1, 2, 3]"], accept_encoding="gzip, identity;q=0")
+    assert headers["content-encoding"] == "gzip"
+    assert gzip.decompress(sent) == b"[1, 2, 3]"
+
+
+def test_no_acceptable_encoding():
+    body = b"x" * 1000
+    _, headers, sent = run([body], accept_encoding="br")
+    assert "content-encoding" not in headers
+    assert sent == body
+
+    _, headers, sent = run([body], accept_encoding=None)
+    assert "content-encoding" not in headers
+    assert sent == body
+
+
+def test_unmarked_routes_untouched():
+    body = b"x" * 1000
+    _, headers, sent = run([body], endpoint=plain_route)
+    assert "content-encoding" not in headers
+    assert "vary" not in headers
+    assert sent == body
+
+
+def test_streamed_bodies():
+    chunks = [b"[", b'"COMP1511",' * 10, b'"COMP1521",' * 10, b"0]"]
+    _, headers, sent = run(chunks)
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    assert gzip.decompress(sent) == b"".join(chunks)
+
+
+def test_etag_weakened():
+    _, headers, _ = run([b"x" * 1000], etag='"abc"')
+    assert headers["etag"] == 'W/"abc"'
+
+    # the 304 carries the same tag as the 200 it stands in for
+    status, headers, sent = run([b""], status=304, etag='"abc"')
+    assert status == 304
+    assert headers["etag"] == 'W/"abc"'
+    assert sent == b""
+
+    # nothing is encoded, so the tag stays strong
+    _, headers, _ = run([b"x" * 1000], accept_encoding="identity", etag='"abc"')
+    assert headers["etag"] == '"abc"'
@@ -0,0 +1,56 @@
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+import asyncio
+import json
+import threading
+
+from server import repository
+from server.repository import MemoryRepository
+from server.server import app
+
+
+async def get(path):
+    """ Sends a GET through the app, returning its status and json body """
+    sent = []
+    async def receive():
+        return {"type": "http.request", "body": b""}
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [], "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 8000),
+    }
+    await app(scope, receive, send)
+    body = b"".join(message.get("body", b"") for message in sent[1:])
+    return sent[0]["status"], json.loads(body)
+
+
+def test_ready_answers_while_repository_builds(monkeypatch):
+    building = threading.Event()
+    release = threading.Event()
+
+    class SlowRepository(MemoryRepository):
+        def __init__(self):  # pylint: disable=super-init-not-called
+            building.set()
+            release.wait(5)
+
+    monkeypatch.setattr(repository, "_repository", None)
+    monkeypatch.setattr(repository, "load_repository", SlowRepository)
+
+    async def main():
+        health = asyncio.create_task(get("/health"))
+        await asyncio.to_thread(building.wait, 5)
+
+        # /health waits on a worker thread, so the loop still answers /ready
+        status, body = await asyncio.wait_for(get("/ready"), timeout=2)
+        assert status in (200, 503)
+        assert "ready" in body
+        assert not health.done()
+
+        release.set()
+        status, body = await asyncio.wait_for(health, timeout=5)
+        assert (status, body) == (200, {"backend": "memory", "healthy": True})
+
+    asyncio.run(main())